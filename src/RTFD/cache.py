@@ -1,5 +1,6 @@
 """
-Cache manager using SQLite for storing library search results.
+Cache manager using SQLite for storing library search results, plus a small
+in-memory LRU cache for provider-level results.
 """
 
 from __future__ import annotations
@@ -9,6 +10,8 @@ import os
 import sqlite3
 import sys
 import time
+from collections import OrderedDict
+from collections.abc import Hashable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -272,3 +275,88 @@ class CacheManager:
         else:
             preview = str(data)[:max_length]
             return preview
+
+
+class MemoryCache:
+    """
+    Bounded in-process LRU cache whose entries expire after a fixed TTL.
+
+    Used by providers for short-lived results that are not worth persisting to SQLite.
+    Expired entries can be kept around for stale_ttl seconds, where peek() still sees
+    them, so a provider can fall back to its last good value when an upstream fails.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 128, stale_ttl: float = 0.0):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry stays valid.
+            maxsize: Maximum number of entries; the least recently used is evicted first.
+            stale_ttl: Seconds an expired entry is retained for peek() before get() drops it.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        # key -> (stored_at, per-entry TTL or None for the cache default, value)
+        self._entries: OrderedDict[Hashable, tuple[float, float | None, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Retrieve an item from the cache.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The cached value, or None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, ttl, value = entry
+        age = time.monotonic() - stored_at
+        ttl = self.ttl if ttl is None else ttl
+        if age >= ttl:
+            if age >= ttl + self.stale_ttl:
+                del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        Store an item in the cache.
+
+        Args:
+            key: Cache key.
+            value: Value to store (None cannot be distinguished from a miss).
+            ttl: Seconds this entry stays valid, if different from the cache's TTL.
+        """
+        self._entries[key] = (time.monotonic(), ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def peek(self, key: Hashable) -> Any | None:
+        """
+        Retrieve an item even if it has expired, without refreshing its recency.
+
+        Lets callers revalidate a stale value (e.g. with an ETag) or fall back to it.
+        Entries stay visible until evicted, or dropped by get() past their stale_ttl.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The stored value, or None if missing.
+        """
+        entry = self._entries.get(key)
+        return None if entry is None else entry[2]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
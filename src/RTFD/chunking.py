@@ -131,8 +131,9 @@ class ChunkingManager:
                     return None
 
                 # Calculate chunk boundaries based on tokens
-                from .token_counter import _encoding
+                from .token_counter import get_encoding
 
+                _encoding = get_encoding()
                 tokens = _encoding.encode(remaining_content)
 
                 if len(tokens) <= chunk_size:
@@ -10,6 +10,13 @@ from docutils.core import publish_parts
 from docutils.writers.html5_polyglot import Writer as HTMLWriter
 from markdownify import markdownify as md
 
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:  # Optional speedup, installed with the "speedups" extra
+    HTML_PARSER = "html.parser"
+
 # Section priority keywords for smart content extraction
 PRIORITY_KEYWORDS = {
     100: ["overview", "introduction", "about", "description"],
@@ -131,7 +138,7 @@ def extract_sections(markdown: str) -> list[Section]:
                         title=current_title,
                         content=section_content,
                         priority=score_section(current_title),
-                        size_bytes=len(section_content.encode("utf-8")),
+                        size_bytes=utf8_len(section_content),
                     )
                 )
 
@@ -151,7 +158,7 @@ def extract_sections(markdown: str) -> list[Section]:
                 title=current_title,
                 content=section_content,
                 priority=score_section(current_title),
-                size_bytes=len(section_content.encode("utf-8")),
+                size_bytes=utf8_len(section_content),
             )
         )
 
@@ -163,7 +170,7 @@ def extract_sections(markdown: str) -> list[Section]:
                 title="Documentation",
                 content=markdown,
                 priority=100,
-                size_bytes=len(markdown.encode("utf-8")),
+                size_bytes=utf8_len(markdown),
             )
         )
 
@@ -232,6 +239,34 @@ def prioritize_sections(sections: list[Section], max_bytes: int = 20480) -> str:
     return "\n\n".join(s.content for s in ordered_result)
 
 
+def utf8_len(text: str) -> int:
+    """Return the UTF-8 size of text, skipping the encode for ASCII-only text."""
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def truncate_utf8(encoded: bytes, max_bytes: int) -> bytes:
+    """
+    Truncate UTF-8 bytes to at most max_bytes without splitting a character.
+
+    Backs off over continuation bytes (at most 3) instead of retrying decodes.
+
+    Args:
+        encoded: UTF-8 encoded text
+        max_bytes: Maximum size in bytes
+
+    Returns:
+        Prefix of encoded that decodes cleanly
+    """
+    if len(encoded) <= max_bytes:
+        return encoded
+
+    cut = max(max_bytes, 0)
+    # 0b10xxxxxx marks a continuation byte; the cut must land on a character start
+    while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+        cut -= 1
+    return encoded[:cut]
+
+
 def smart_truncate(text: str, max_bytes: int) -> str:
     """
     Truncate text to byte limit while preserving structure.
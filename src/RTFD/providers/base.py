@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Hashable
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, TypeVar
 
 import httpx
 
+from ..content_utils import truncate_utf8
+
+T = TypeVar("T")
+
 
 @dataclass
 class ToolTierInfo:
@@ -72,6 +77,10 @@ class BaseProvider(ABC):
             http_client_factory: Async function that returns configured httpx.AsyncClient
         """
         self._http_client_factory = http_client_factory
+        self._client: httpx.AsyncClient | None = None
+        self._client_lock = asyncio.Lock()
+        # key -> in-flight task shared by concurrent callers (see _coalesce)
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
 
     @abstractmethod
     def get_metadata(self) -> ProviderMetadata:
@@ -109,3 +118,76 @@ class BaseProvider(ABC):
     async def _http_client(self) -> httpx.AsyncClient:
         """Get configured HTTP client instance."""
         return await self._http_client_factory()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get the provider's long-lived HTTP client, creating it on first use.
+
+        Unlike _http_client(), the returned client is shared across calls so
+        pooled connections are reused. Do not use it as a context manager.
+        """
+        if self._client is None:
+            async with self._client_lock:
+                # A concurrent caller may have created it while we waited
+                if self._client is None:
+                    self._client = await self._http_client_factory()
+        return self._client
+
+    async def _fetch_capped(self, url: str, max_bytes: int) -> tuple[bytes, bool]:
+        """Stream a GET response body, reading at most max_bytes.
+
+        The connection is released as soon as the cap is exceeded, so oversized
+        files never load fully into memory.
+
+        Returns:
+            Tuple of (body cut on a UTF-8 character boundary, truncated)
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status
+        """
+        client = await self._get_client()
+        buf = bytearray()
+        async with client.stream("GET", url) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.aiter_bytes():
+                buf.extend(chunk)
+                if len(buf) > max_bytes:
+                    break
+
+        if len(buf) > max_bytes:
+            return truncate_utf8(bytes(buf), max_bytes), True
+        return bytes(buf), False
+
+    async def _coalesce(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run factory() once for all concurrent callers using the same key (singleflight).
+
+        Callers arriving while a task for key is in flight await that task instead
+        of starting their own. The task is shielded, so one caller being cancelled
+        does not cancel it for the others.
+
+        Args:
+            key: Identifies the shared work, e.g. a URL
+            factory: Zero-argument coroutine function doing the work
+
+        Returns:
+            The task's result; its exception is raised to every caller
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+
+            def _forget(done: asyncio.Future[Any]) -> None:
+                self._inflight.pop(key, None)
+                if not done.cancelled():
+                    done.exception()  # Mark retrieved even if every caller was cancelled
+
+            task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    async def aclose(self) -> None:
+        """Close the long-lived HTTP client, if one was created."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -2,28 +2,65 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import re
 from collections.abc import Callable
 from typing import Any
 
 import httpx
 from mcp.types import CallToolResult
 
+from ..cache import MemoryCache
+from ..content_utils import truncate_utf8
 from ..utils import (
     chunk_and_serialize_response,
+    get_cache_config,
     is_fetch_enabled,
     safe_json_loads,
     serialize_response_with_meta,
 )
 from .base import BaseProvider, ProviderMetadata, ProviderResult, ToolTierInfo
 
+# GitHub Dockerfile links in image descriptions:
+# https://github.com/[owner]/[repo]/blob/[ref]/[path/to/]Dockerfile
+_DOCKERFILE_RE = re.compile(
+    r"https://github\.com/[\w.-]+/[\w.-]+/blob/[\w.-]+(?:/[\w.-]+)*/Dockerfile", re.ASCII
+)
+
 
 class DockerHubProvider(BaseProvider):
     """Provider for DockerHub Docker image metadata and search."""
 
     DOCKERHUB_API_URL = "https://hub.docker.com/v2"
+    MAX_DOCKERFILE_CANDIDATES = 5  # Dockerfile links probed concurrently per image
+    METADATA_CACHE_TTL = 600.0  # Seconds a repository payload is served from memory
+    METADATA_NEGATIVE_TTL = 60.0  # Seconds a 404 is remembered for non-existent images
+    METADATA_STALE_TTL = 86400.0  # Seconds an expired payload may still be served on errors
+    METADATA_CACHE_SIZE = 256
+    STALE_ON_STATUS = frozenset({429, 500, 502, 503, 504})
+    BULK_CONCURRENCY = 8  # Default bulk requests in flight (RTFD_DOCKERHUB_CONCURRENCY)
+
+    def __init__(self, http_client_factory: Callable):
+        """Initialize provider with HTTP client factory and repository payload cache."""
+        super().__init__(http_client_factory)
+        # repo_path -> payload, or the 404 error for missing images. Expired payloads
+        # stay peekable until METADATA_STALE_TTL as a fallback when DockerHub fails.
+        self._meta_cache = MemoryCache(
+            ttl=self.METADATA_CACHE_TTL,
+            maxsize=self.METADATA_CACHE_SIZE,
+            stale_ttl=self.METADATA_STALE_TTL - self.METADATA_CACHE_TTL,
+        )
+        try:
+            concurrency = int(os.getenv("RTFD_DOCKERHUB_CONCURRENCY", str(self.BULK_CONCURRENCY)))
+        except ValueError:
+            concurrency = self.BULK_CONCURRENCY
+        # Shared by all bulk calls, so parallel docker_images_metadata calls stay within
+        # the connection pool and DockerHub's rate limits
+        self._bulk_semaphore = asyncio.Semaphore(max(concurrency, 1))
 
     def get_metadata(self) -> ProviderMetadata:
-        tool_names = ["search_docker_images", "docker_image_metadata"]
+        tool_names = ["search_docker_images", "docker_image_metadata", "docker_images_metadata"]
         if is_fetch_enabled():
             tool_names.append("fetch_docker_image_docs")
             tool_names.append("fetch_dockerfile")
@@ -34,6 +71,9 @@ class DockerHubProvider(BaseProvider):
             "docker_image_metadata": ToolTierInfo(
                 tier=3, defer_recommended=True, category="metadata"
             ),
+            "docker_images_metadata": ToolTierInfo(
+                tier=4, defer_recommended=True, category="metadata"
+            ),
             "fetch_docker_image_docs": ToolTierInfo(
                 tier=3, defer_recommended=True, category="fetch"
             ),
@@ -47,7 +87,7 @@ class DockerHubProvider(BaseProvider):
             tool_names=tool_names,
             supports_library_search=False,  # DockerHub search is image-centric, not lib-doc
             required_env_vars=[],
-            optional_env_vars=[],
+            optional_env_vars=["RTFD_DOCKERHUB_CONCURRENCY"],
             tool_tiers=tool_tiers,
         )
 
@@ -69,30 +109,26 @@ class DockerHubProvider(BaseProvider):
             url = f"{self.DOCKERHUB_API_URL}/search/repositories/"
             params = {"query": query, "page_size": limit}
 
-            async with await self._http_client() as client:
-                resp = await client.get(url, params=params)
-                resp.raise_for_status()
-                payload = safe_json_loads(resp.text)
-
-            # Transform results
-            results = []
-            for item in payload.get("results", []):
-                repo_name = item.get("repo_name", "")
-                repo_owner = item.get("repo_owner", "")
-                # For official images, repo_owner is empty, show as library/name
-                display_name = f"{repo_owner}/{repo_name}" if repo_owner else f"library/{repo_name}"
-
-                results.append(
-                    {
-                        "name": repo_name,
-                        "owner": repo_owner or "library",
-                        "description": item.get("short_description", ""),
-                        "star_count": item.get("star_count", 0),
-                        "pull_count": item.get("pull_count", 0),
-                        "is_official": item.get("is_official", False),
-                        "url": f"https://hub.docker.com/r/{display_name}",
-                    }
-                )
+            client = await self._get_client()
+            resp = await client.get(url, params=params)
+            resp.raise_for_status()
+            payload = safe_json_loads(resp.content)
+
+            # Transform results. Official images have an empty repo_owner and are
+            # shown as library/name; dict values are evaluated in order, so the
+            # walrus-bound name/owner are available when building the URL.
+            results = [
+                {
+                    "name": (name := item.get("repo_name", "")),
+                    "owner": (owner := item.get("repo_owner", "")) or "library",
+                    "description": item.get("short_description", ""),
+                    "star_count": item.get("star_count", 0),
+                    "pull_count": item.get("pull_count", 0),
+                    "is_official": item.get("is_official", False),
+                    "url": f"https://hub.docker.com/r/{owner or 'library'}/{name}",
+                }
+                for item in payload.get("results", [])
+            ]
 
             return {
                 "query": query,
@@ -100,24 +136,99 @@ class DockerHubProvider(BaseProvider):
                 "results": results,
             }
 
-        except httpx.HTTPStatusError as exc:
-            return {
-                "query": query,
-                "error": f"DockerHub returned {exc.response.status_code}",
-                "results": [],
-            }
-        except httpx.HTTPError as exc:
-            return {
-                "query": query,
-                "error": f"DockerHub request failed: {exc}",
-                "results": [],
-            }
         except Exception as exc:
-            return {
-                "query": query,
-                "error": f"Failed to search images: {exc!s}",
-                "results": [],
-            }
+            return {"query": query, **self._error(exc, "search images"), "results": []}
+
+    @staticmethod
+    def _repo_path(image: str) -> str:
+        """Map an image name to its DockerHub repository path ('nginx' -> 'library/nginx')."""
+        return image if "/" in image else f"library/{image}"
+
+    async def _fetch_image_raw(self, image: str) -> tuple[dict[str, Any], bool]:
+        """Fetch the raw DockerHub repository payload for an image.
+
+        Payloads are kept in memory for METADATA_CACHE_TTL seconds (404s for
+        METADATA_NEGATIVE_TTL) so repeated tool calls for the same image do not
+        hit DockerHub or count against its rate limits. Expired payloads are kept
+        for up to METADATA_STALE_TTL and served instead of an error when DockerHub
+        is rate limiting (429), failing (5xx) or unreachable.
+
+        Returns:
+            Tuple of (payload, stale), where stale is True for a fallback payload
+
+        Raises:
+            httpx.HTTPError: If the request fails or DockerHub returns an error status
+        """
+        repo_path = self._repo_path(image)
+        cache_enabled, _ = get_cache_config()
+
+        stale: dict[str, Any] | None = None
+        if cache_enabled:
+            cached = self._meta_cache.get(repo_path)
+            if isinstance(cached, httpx.HTTPStatusError):
+                raise cached.with_traceback(None)
+            if cached is not None:
+                return cached, False
+            # get() has dropped payloads past the stale window; 404s are never served stale
+            expired = self._meta_cache.peek(repo_path)
+            if not isinstance(expired, httpx.HTTPStatusError):
+                stale = expired
+
+        # Concurrent lookups of the same image share one request
+        return await self._coalesce(
+            repo_path, lambda: self._request_image_raw(repo_path, stale, cache_enabled)
+        )
+
+    async def _request_image_raw(
+        self, repo_path: str, stale: dict[str, Any] | None, cache_enabled: bool
+    ) -> tuple[dict[str, Any], bool]:
+        """Request a repository payload from DockerHub and update the cache."""
+        url = f"{self.DOCKERHUB_API_URL}/repositories/{repo_path}/"
+
+        try:
+            client = await self._get_client()
+            resp = await client.get(url)
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            status = exc.response.status_code
+            if stale is not None and status in self.STALE_ON_STATUS:
+                return stale, True
+            if cache_enabled and status == 404:
+                self._meta_cache.set(repo_path, exc, ttl=self.METADATA_NEGATIVE_TTL)
+            raise
+        except httpx.TransportError:
+            if stale is not None:
+                return stale, True
+            raise
+        data = safe_json_loads(resp.content)
+
+        if cache_enabled:
+            self._meta_cache.set(repo_path, data)
+        return data, False
+
+    @staticmethod
+    def _error(exc: Exception, action: str, not_found: str | None = None) -> dict[str, str]:
+        """Map an exception from a DockerHub call to the provider's error dict.
+
+        Args:
+            exc: Exception raised by the request or response handling
+            action: What was being done, for unexpected errors ("Failed to {action}")
+            not_found: Message to use for a 404, if it deserves a specific one
+        """
+        if isinstance(exc, httpx.HTTPStatusError):
+            if not_found and exc.response.status_code == 404:
+                return {"error": not_found}
+            return {"error": f"DockerHub returned {exc.response.status_code}"}
+        if isinstance(exc, httpx.HTTPError):
+            return {"error": f"DockerHub request failed: {exc}"}
+        return {"error": f"Failed to {action}: {exc!s}"}
+
+    def _metadata_error(self, image: str, exc: Exception) -> dict[str, Any]:
+        """Build the error dict returned when an image payload cannot be fetched."""
+        return {
+            "image": image,
+            **self._error(exc, "fetch metadata", not_found="Image not found on DockerHub"),
+        }
 
     async def _fetch_image_metadata(self, image: str) -> dict[str, Any]:
         """Fetch detailed metadata for a Docker image.
@@ -129,54 +240,50 @@ class DockerHubProvider(BaseProvider):
             Dict with image metadata
         """
         try:
-            # Handle library images (e.g., 'nginx' -> 'library/nginx')
-            if "/" not in image:
-                repo_path = f"library/{image}"
-            else:
-                repo_path = image
+            data, stale = await self._fetch_image_raw(image)
+        except Exception as exc:
+            return self._metadata_error(image, exc)
+
+        metadata = {
+            "name": data.get("name"),
+            "namespace": data.get("namespace"),
+            "full_name": data.get("full_name", f"{data.get('namespace')}/{data.get('name')}"),
+            "description": data.get("description", ""),
+            "readme": data.get("readme", ""),  # Full readme text if available
+            "last_updated": data.get("last_updated"),
+            "star_count": data.get("star_count", 0),
+            "pull_count": data.get("pull_count", 0),
+            "is_official": data.get("is_official", False),
+            "is_private": data.get("is_private", False),
+            "repository_type": data.get("repository_type"),
+            "url": f"https://hub.docker.com/r/{self._repo_path(image)}",
+        }
+        if stale:
+            # DockerHub is rate limiting or failing; this is the last good payload
+            metadata["stale"] = True
+        return metadata
 
-            url = f"{self.DOCKERHUB_API_URL}/repositories/{repo_path}/"
+    async def _fetch_images_metadata(self, images: list[str]) -> dict[str, Any]:
+        """Fetch metadata for several Docker images concurrently.
 
-            async with await self._http_client() as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-                data = safe_json_loads(resp.text)
+        At most RTFD_DOCKERHUB_CONCURRENCY requests are in flight at once.
 
-            return {
-                "name": data.get("name"),
-                "namespace": data.get("namespace"),
-                "full_name": data.get("full_name", f"{data.get('namespace')}/{data.get('name')}"),
-                "description": data.get("description", ""),
-                "readme": data.get("readme", ""),  # Full readme text if available
-                "last_updated": data.get("last_updated"),
-                "star_count": data.get("star_count", 0),
-                "pull_count": data.get("pull_count", 0),
-                "is_official": data.get("is_official", False),
-                "is_private": data.get("is_private", False),
-                "repository_type": data.get("repository_type"),
-                "url": f"https://hub.docker.com/r/{repo_path}",
-            }
+        Args:
+            images: Image names, as accepted by _fetch_image_metadata
 
-        except httpx.HTTPStatusError as exc:
-            if exc.response.status_code == 404:
-                return {
-                    "image": image,
-                    "error": "Image not found on DockerHub",
-                }
-            return {
-                "image": image,
-                "error": f"DockerHub returned {exc.response.status_code}",
-            }
-        except httpx.HTTPError as exc:
-            return {
-                "image": image,
-                "error": f"DockerHub request failed: {exc}",
-            }
-        except Exception as exc:
-            return {
-                "image": image,
-                "error": f"Failed to fetch metadata: {exc!s}",
-            }
+        Returns:
+            Dict with per-image metadata (or error) dicts, in request order
+        """
+
+        async def fetch(image: str) -> dict[str, Any]:
+            async with self._bulk_semaphore:
+                return await self._fetch_image_metadata(image)
+
+        results = await asyncio.gather(*(fetch(i) for i in images))
+        return {
+            "count": len(results),
+            "images": list(results),
+        }
 
     async def _fetch_image_docs(self, image: str, max_bytes: int = 20480) -> dict[str, Any]:
         """Fetch documentation for a Docker image.
@@ -214,21 +321,31 @@ class DockerHubProvider(BaseProvider):
             elif not description:
                 content = "No documentation available for this image."
 
-            # Truncate if necessary
-            content_bytes = content.encode("utf-8")
-            if len(content_bytes) > max_bytes:
-                content = content[:max_bytes]
-                truncated = True
+            # Truncate if necessary (by bytes, on a character boundary).
+            # ASCII text is one byte per character, so it needs no encoding at all.
+            if content.isascii():
+                truncated = len(content) > max_bytes
+                if truncated:
+                    content = content[:max_bytes]
+                size_bytes = len(content)
             else:
-                truncated = False
-
-            return {
+                content_bytes = content.encode("utf-8")
+                truncated = len(content_bytes) > max_bytes
+                if truncated:
+                    content_bytes = truncate_utf8(content_bytes, max_bytes)
+                    content = content_bytes.decode("utf-8")
+                size_bytes = len(content_bytes)
+
+            result = {
                 "image": image,
                 "content": content,
-                "size_bytes": len(content.encode("utf-8")),
+                "size_bytes": size_bytes,
                 "source": "dockerhub",
                 "truncated": truncated,
             }
+            if metadata.get("stale"):
+                result["stale"] = True
+            return result
 
         except Exception as exc:
             return {
@@ -239,60 +356,35 @@ class DockerHubProvider(BaseProvider):
                 "source": None,
             }
 
-    async def _fetch_dockerfile(self, image: str) -> dict[str, Any]:
+    async def _fetch_dockerfile(self, image: str, max_bytes: int = 262144) -> dict[str, Any]:
         """Fetch Dockerfile for an image by parsing its description for GitHub links.
 
         Args:
             image: Image name (e.g., 'nginx', 'python')
+            max_bytes: Maximum Dockerfile size in bytes
 
         Returns:
             Dict with Dockerfile content or error
         """
-        import re
-
+        # 1. Get the raw repository payload; its full_description (README) lists the
+        # Dockerfile links, so a single request serves both the error check and the parse.
         try:
-            # 1. Get image metadata to find the description
-            metadata = await self._fetch_image_metadata(image)
-            if "error" in metadata:
-                return {
-                    "image": image,
-                    "error": metadata["error"],
-                    "source": None,
-                }
-
-            # 2. Get the full description (README)
-            # Note: _fetch_image_metadata might not return full_description if it uses the summary endpoint,
-            # but let's check if we need to make a separate call or if we can rely on what we have.
-            # The previous investigation showed we need to hit the repository endpoint which _fetch_image_metadata does.
-            # However, the 'readme' field in _fetch_image_metadata comes from 'readme' key in JSON.
-            # Let's verify if 'full_description' is available in the payload of _fetch_image_metadata.
-            # Looking at _fetch_image_metadata implementation:
-            # url = f"{self.DOCKERHUB_API_URL}/repositories/{repo_path}/"
-            # This endpoint returns 'full_description' usually.
-            # But _fetch_image_metadata returns a dict with specific keys.
-            # We need to access the raw description.
-
-            # Let's re-fetch to be sure we get the full description text to parse
-            if "/" not in image:
-                repo_path = f"library/{image}"
-            else:
-                repo_path = image
-
-            url = f"{self.DOCKERHUB_API_URL}/repositories/{repo_path}/"
-
-            async with await self._http_client() as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-                data = safe_json_loads(resp.text)
-
-            full_desc = data.get("full_description", "")
-
-            # 3. Find GitHub Dockerfile links
-            # Pattern: https://github.com/[owner]/[repo]/blob/[ref]/[path/to/]Dockerfile
-            # We want to capture the whole URL
-            github_pattern = r"https://github\.com/[a-zA-Z0-9_.-]+/[a-zA-Z0-9_.-]+/blob/[a-zA-Z0-9_.-]+(?:/[a-zA-Z0-9_.-]+)*/Dockerfile"
+            data, _ = await self._fetch_image_raw(image)
+        except Exception as exc:
+            return {**self._metadata_error(image, exc), "source": None}
 
-            matches = re.findall(github_pattern, full_desc)
+        try:
+            full_desc = data.get("full_description") or ""
+
+            # 2. Find GitHub Dockerfile links, in description order (the first is often
+            # 'latest') and without duplicates; stop scanning once we have enough candidates
+            matches: list[str] = []
+            for match in _DOCKERFILE_RE.finditer(full_desc):
+                url = match.group(0)
+                if url not in matches:
+                    matches.append(url)
+                    if len(matches) >= self.MAX_DOCKERFILE_CANDIDATES:
+                        break
 
             if not matches:
                 return {
@@ -301,30 +393,43 @@ class DockerHubProvider(BaseProvider):
                     "source": "dockerhub_description",
                 }
 
-            # Use the first match (often the 'latest' or most prominent one)
-            # Ideally we'd match against a specific tag if provided, but for now we take the first one.
-            dockerfile_url = matches[0]
-
-            # 4. Convert to raw GitHub URL
+            # 3. Convert to raw GitHub URLs
             # From: https://github.com/user/repo/blob/ref/path/Dockerfile
             # To:   https://raw.githubusercontent.com/user/repo/ref/path/Dockerfile
-
-            raw_url = dockerfile_url.replace("github.com", "raw.githubusercontent.com").replace(
-                "/blob/", "/"
+            raw_urls = [
+                url.replace("github.com", "raw.githubusercontent.com").replace("/blob/", "/")
+                for url in matches
+            ]
+
+            # 4. Probe the candidates concurrently and keep the first one that resolves
+            responses = await asyncio.gather(
+                *(self._fetch_capped(url, max_bytes) for url in raw_urls),
+                return_exceptions=True,
             )
 
-            # 5. Fetch the Dockerfile
-            async with await self._http_client() as client:
-                resp = await client.get(raw_url)
-                resp.raise_for_status()
-                content = resp.text
+            failure = None
+            for raw_url, resp in zip(raw_urls, responses, strict=True):
+                if isinstance(resp, httpx.HTTPStatusError):
+                    failure = failure or f"GitHub returned {resp.response.status_code}"
+                    continue
+                if isinstance(resp, BaseException):
+                    failure = failure or f"{resp!s}"
+                    continue
+
+                body, truncated = resp
+                return {
+                    "image": image,
+                    "content": body.decode("utf-8", errors="replace"),
+                    "size_bytes": len(body),
+                    "source": raw_url,
+                    "found_in_description": True,
+                    "truncated": truncated,
+                }
 
             return {
                 "image": image,
-                "content": content,
-                "size_bytes": len(content.encode("utf-8")),
-                "source": raw_url,
-                "found_in_description": True,
+                "error": f"Failed to fetch Dockerfile: {failure}",
+                "source": None,
             }
 
         except Exception as exc:
@@ -361,6 +466,17 @@ class DockerHubProvider(BaseProvider):
             result = await self._fetch_image_metadata(image)
             return serialize_response_with_meta(result)
 
+        async def docker_images_metadata(images: list[str]) -> CallToolResult:
+            """
+            Get metadata for several Docker images in one call (fetched concurrently).
+
+            When: Comparing images, e.g. nginx vs caddy vs traefik
+            Args: images=["nginx", "postgres", "redis"]
+            Ex: docker_images_metadata(["nginx", "httpd"]) → list of stats and metadata
+            """
+            result = await self._fetch_images_metadata(images)
+            return serialize_response_with_meta(result)
+
         async def fetch_docker_image_docs(image: str, max_bytes: int = 20480) -> CallToolResult:
             """
             Fetch Docker image README from DockerHub. Usage, env vars, volumes, config, examples.
@@ -372,21 +488,22 @@ class DockerHubProvider(BaseProvider):
             result = await self._fetch_image_docs(image, max_bytes)
             return chunk_and_serialize_response(result)
 
-        async def fetch_dockerfile(image: str) -> CallToolResult:
+        async def fetch_dockerfile(image: str, max_bytes: int = 262144) -> CallToolResult:
             """
             Fetch Dockerfile used to build image. Shows base, packages, config, optimizations.
 
             When: Need to understand image composition or audit security
             Note: Not all images have public Dockerfiles
-            Args: image="nginx"
+            Args: image="nginx", max_bytes=262144
             Ex: fetch_dockerfile("python") → Dockerfile from source repo
             """
-            result = await self._fetch_dockerfile(image)
+            result = await self._fetch_dockerfile(image, max_bytes)
             return chunk_and_serialize_response(result)
 
         tools = {
             "search_docker_images": search_docker_images,
             "docker_image_metadata": docker_image_metadata,
+            "docker_images_metadata": docker_images_metadata,
         }
         if is_fetch_enabled():
             tools["fetch_docker_image_docs"] = fetch_docker_image_docs
@@ -2,16 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import os
+import re
+import time
+from bisect import bisect_right
+from collections import defaultdict
 from collections.abc import Callable
 from typing import Any
 from urllib.parse import urljoin
 
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 from mcp.types import CallToolResult
 
-from ..content_utils import extract_sections, html_to_markdown, prioritize_sections
-from ..utils import chunk_and_serialize_response, is_fetch_enabled, serialize_response_with_meta
+from ..cache import MemoryCache
+from ..content_utils import (
+    HTML_PARSER,
+    extract_sections,
+    html_to_markdown,
+    prioritize_sections,
+    truncate_utf8,
+    utf8_len,
+)
+from ..utils import (
+    chunk_and_serialize_response,
+    get_cache_config,
+    is_fetch_enabled,
+    serialize_response_with_meta,
+)
 from .base import BaseProvider, ProviderMetadata, ProviderResult, ToolTierInfo
 
 # Base URL for LogScale documentation
@@ -177,10 +197,178 @@ FUNCTION_CATEGORIES = {
     },
 }
 
+# Derived once at import instead of per call
+for _info in (*SYNTAX_TOPICS.values(), *FUNCTION_CATEGORIES.values()):
+    _info["description_lower"] = _info["description"].lower()
+    _info["url"] = urljoin(BASE_URL, _info["page"])
+del _info
+_AVAILABLE_TOPICS = ", ".join(sorted(SYNTAX_TOPICS))
+_AVAILABLE_CATEGORIES = ", ".join(sorted(FUNCTION_CATEGORIES))
+
+# Relative links to individual function (or category) pages
+_FUNC_HREF_RE = re.compile(r"\Afunctions-.*\.html\Z", re.DOTALL)
+
+# Category index pages, which are linked like functions but list them instead
+_CATEGORY_PAGES = frozenset(info["page"] for info in FUNCTION_CATEGORIES.values())
+
+# Elements converted to markdown, in document order, by the per-element extraction walk
+_CONTENT_TAGS = frozenset(
+    {"h1", "h2", "h3", "h4", "h5", "h6", "p", "table", "pre", "code", "ul", "ol", "dl"}
+)
+
+# Extracted markdown shorter than this falls back to converting the whole content area
+MIN_ELEMENT_CONTENT = 200
+
+# Class/id fragments of navigation and page chrome removed before extraction
+_UNWANTED_RE = re.compile(
+    "nav|sidebar|menu|breadcrumb|toc|footer|header|skip|social|share|cookie|banner",
+    re.IGNORECASE,
+)
+
+# Search hit fields: (type, name, description, url)
+_Entry = tuple[str, str, str, str]
+
+
+def _substrings(text: str) -> set[str]:
+    """Return every non-empty substring of text."""
+    return {text[i:j] for i in range(len(text)) for j in range(i + 1, len(text) + 1)}
+
+
+def _build_search_index() -> tuple[list[_Entry], dict[str, list[tuple[int, int]]]]:
+    """
+    Build the static search entries and an inverted index over them.
+
+    Query words never contain whitespace, so a word occurs in a description exactly
+    when it is a substring of one of its whitespace-separated tokens. Indexing every
+    substring of each key (weight 3) and description token (weight 1) therefore
+    reproduces `word in key` / `word in description` matching with one dict lookup.
+
+    Returns:
+        Tuple of (entries in syntax-then-category order, substring -> [(entry, weight)]),
+        where each entry is a (type, name, description, url) tuple
+    """
+    entries: list[_Entry] = []
+    index: defaultdict[str, list[tuple[int, int]]] = defaultdict(list)
+
+    for entry_type, table in (
+        ("syntax", SYNTAX_TOPICS),
+        ("function_category", FUNCTION_CATEGORIES),
+    ):
+        for key, info in table.items():
+            entry_id = len(entries)
+            entries.append((entry_type, key, info["description"], info["url"]))
+            for sub in _substrings(key):
+                index[sub].append((entry_id, 3))
+            desc_subs = set().union(*map(_substrings, info["description_lower"].split()))
+            for sub in desc_subs:
+                index[sub].append((entry_id, 1))
+
+    return entries, dict(index)
+
+
+_SEARCH_ENTRIES, _SEARCH_INDEX = _build_search_index()
+
+
+class _JoinedText:
+    """Strings joined with NUL so a substring search over all of them is one C-level scan."""
+
+    SEP = "\0"
+
+    def __init__(self, values: list[str]):
+        self.text = self.SEP.join(values)
+        self.starts: list[int] = []
+        pos = 0
+        for value in values:
+            self.starts.append(pos)
+            pos += len(value) + 1
+
+    def containing(self, word: str) -> list[int]:
+        """Return the indices of the values containing word, in order."""
+        if not word or self.SEP in word:
+            return []
+        hits: list[int] = []
+        pos = self.text.find(word)
+        while pos != -1:
+            idx = bisect_right(self.starts, pos) - 1
+            hits.append(idx)
+            if idx + 1 == len(self.starts):
+                break
+            # Resume at the next value; further hits in this one add nothing
+            pos = self.text.find(word, self.starts[idx + 1])
+        return hits
+
+
+class _KeyMatcher:
+    """
+    Resolve a partial topic/category name to the first related key of a table.
+
+    A key is related when the query contains it, it contains the query, or (with
+    descriptions) its lowercased description contains the query; the earliest
+    related key in definition order wins.
+    """
+
+    def __init__(self, table: dict[str, dict[str, str]], match_descriptions: bool = False):
+        keys = list(table)
+        self._keys = keys
+        self._order = {key: i for i, key in enumerate(keys)}
+        # Lookahead alternation in definition order reports, at every position,
+        # the earliest key starting there, so the earliest contained key is found
+        self._contained = re.compile("(?=(" + "|".join(map(re.escape, keys)) + "))")
+        self._joined_keys = _JoinedText(keys)
+        self._joined_descriptions = (
+            _JoinedText([info["description_lower"] for info in table.values()])
+            if match_descriptions
+            else None
+        )
+
+    def first(self, query: str) -> str | None:
+        """Return the first key related to the lowercased query, or None."""
+        if not query:
+            # "" is contained in every key, so the first key is related
+            return self._keys[0] if self._keys else None
+        candidates = [self._order[m.group(1)] for m in self._contained.finditer(query)]
+        candidates.extend(self._joined_keys.containing(query)[:1])
+        if self._joined_descriptions is not None:
+            candidates.extend(self._joined_descriptions.containing(query)[:1])
+        return self._keys[min(candidates)] if candidates else None
+
+
+_TOPIC_MATCHER = _KeyMatcher(SYNTAX_TOPICS, match_descriptions=True)
+_CATEGORY_MATCHER = _KeyMatcher(FUNCTION_CATEGORIES)
+
+
+class _FunctionIndex:
+    """Function links from functions.html with joined lowercase names and hrefs."""
+
+    def __init__(self, functions: list[tuple[str, str]]):
+        self.functions = functions
+        self.urls = [urljoin(BASE_URL, href) for _, href in functions]
+        self.names = _JoinedText([name.lower() for name, _ in functions])
+        self.hrefs = _JoinedText([href.lower() for _, href in functions])
+
 
 class LogscaleProvider(BaseProvider):
     """Provider for LogScale (Humio) query language documentation."""
 
+    FUNCTIONS_INDEX_TTL = 3600.0  # Seconds the parsed functions.html link list is reused
+    PAGE_CACHE_TTL = 3600.0  # Default seconds extracted pages are reused (RTFD_LOGSCALE_CACHE_TTL)
+    PAGE_CACHE_SIZE = 128
+    MAX_PAGE_BYTES = 4 * 1024 * 1024  # Pages are cut off beyond this size
+    LIST_CONCURRENCY = 5  # Category pages fetched at once when listing every function
+
+    def __init__(self, http_client_factory: Callable):
+        """Initialize provider with HTTP client factory and documentation caches."""
+        super().__init__(http_client_factory)
+        try:
+            page_ttl = float(os.getenv("RTFD_LOGSCALE_CACHE_TTL", str(self.PAGE_CACHE_TTL)))
+        except ValueError:
+            page_ttl = self.PAGE_CACHE_TTL
+        # ("docs", url) -> (markdown, signature); ("functions", url) -> category function list
+        self._page_cache = MemoryCache(ttl=page_ttl, maxsize=self.PAGE_CACHE_SIZE)
+        # (fetched_at, function links parsed from functions.html)
+        self._functions_index: tuple[float, _FunctionIndex] | None = None
+        self._functions_lock = asyncio.Lock()
+
     def get_metadata(self) -> ProviderMetadata:
         tool_names = ["search_logscale_docs", "list_logscale_functions"]
         if is_fetch_enabled():
@@ -202,7 +390,7 @@ class LogscaleProvider(BaseProvider):
             tool_names=tool_names,
             supports_library_search=False,
             required_env_vars=[],
-            optional_env_vars=[],
+            optional_env_vars=["RTFD_LOGSCALE_CACHE_TTL"],
             tool_tiers=tool_tiers,
         )
 
@@ -215,11 +403,82 @@ class LogscaleProvider(BaseProvider):
         )
 
     async def _fetch_page(self, url: str) -> BeautifulSoup:
-        """Fetch and parse an HTML page."""
-        async with await self._http_client() as client:
-            resp = await client.get(url, follow_redirects=True)
-            resp.raise_for_status()
-            return BeautifulSoup(resp.text, "html.parser")
+        """
+        Fetch and parse an HTML page.
+
+        The body is streamed and capped at MAX_PAGE_BYTES, then handed to the parser
+        as bytes so it is never also held as a decoded str.
+        """
+        body, _ = await self._fetch_capped(url, self.MAX_PAGE_BYTES)
+        return BeautifulSoup(body, HTML_PARSER)
+
+    async def _get_page_docs(self, url: str) -> tuple[str, str]:
+        """
+        Return the extracted markdown and function signature for a documentation page.
+
+        Results are cached per URL so repeated lookups skip the fetch and the parse,
+        and concurrent lookups of the same URL share one.
+
+        Returns:
+            Tuple of (markdown, signature); signature is empty when the page has none
+        """
+        cache_enabled, _ = get_cache_config()
+        key = ("docs", url)
+        cached = self._page_cache.get(key) if cache_enabled else None
+        if cached is not None:
+            return cached
+
+        async def load() -> tuple[str, str]:
+            soup = await self._fetch_page(url)
+            # Read the signature first; extraction prunes the tree in place
+            sig_elem = soup.find("code", class_="code-highlight")
+            signature = sig_elem.get_text(strip=True) if sig_elem else ""
+            page = (self._extract_markdown(soup, url), signature)
+            if cache_enabled:
+                self._page_cache.set(key, page)
+            return page
+
+        # Concurrent lookups of the same page share one fetch and parse
+        return await self._coalesce(key, load)
+
+    async def _get_function_index(self) -> _FunctionIndex:
+        """
+        Return the function links listed on functions.html.
+
+        The parsed index is reused for FUNCTIONS_INDEX_TTL seconds; the lock makes
+        concurrent searches share a single fetch.
+        """
+        async with self._functions_lock:
+            cache_enabled, _ = get_cache_config()
+            cached = self._functions_index
+            if (
+                cache_enabled
+                and cached is not None
+                and time.monotonic() - cached[0] < self.FUNCTIONS_INDEX_TTL
+            ):
+                return cached[1]
+
+            soup = await self._fetch_page(urljoin(BASE_URL, "functions.html"))
+            functions: list[tuple[str, str]] = []
+            for link in soup.find_all("a", href=_FUNC_HREF_RE):
+                href = link["href"]
+                # Skip category pages
+                if href in _CATEGORY_PAGES:
+                    continue
+
+                func_name = link.get_text(strip=True)
+                if not func_name:
+                    continue
+
+                # Extract function name from URL as fallback
+                if not func_name or func_name == href:
+                    func_name = href.replace("functions-", "").replace(".html", "")
+
+                functions.append((func_name, href))
+
+            index = _FunctionIndex(functions)
+            self._functions_index = (time.monotonic(), index)
+            return index
 
     async def _search_docs(self, query: str, limit: int = 10) -> dict[str, Any]:
         """
@@ -229,109 +488,58 @@ class LogscaleProvider(BaseProvider):
         """
         query_lower = query.lower()
         query_words = query_lower.split()
-        results: list[dict[str, Any]] = []
-
-        # Search syntax topics
-        for topic_key, topic_info in SYNTAX_TOPICS.items():
-            score = 0
-            for word in query_words:
-                if word in topic_key:
-                    score += 3
-                if word in topic_info["description"].lower():
-                    score += 1
-            if score > 0:
-                results.append(
-                    {
-                        "type": "syntax",
-                        "name": topic_key,
-                        "description": topic_info["description"],
-                        "url": urljoin(BASE_URL, topic_info["page"]),
-                        "score": score,
-                    }
-                )
+        # (score, type, name, description, url); dicts are built only for returned hits
+        results: list[tuple[int, str, str, str, str]] = []
 
-        # Search function categories
-        for cat_key, cat_info in FUNCTION_CATEGORIES.items():
-            score = 0
-            for word in query_words:
-                if word in cat_key:
-                    score += 3
-                if word in cat_info["description"].lower():
-                    score += 1
-            if score > 0:
-                results.append(
-                    {
-                        "type": "function_category",
-                        "name": cat_key,
-                        "description": cat_info["description"],
-                        "url": urljoin(BASE_URL, cat_info["page"]),
-                        "score": score,
-                    }
-                )
+        # Score syntax topics and function categories via the prebuilt index
+        scores: defaultdict[int, int] = defaultdict(int)
+        for word in query_words:
+            for entry_id, weight in _SEARCH_INDEX.get(word, ()):
+                scores[entry_id] += weight
+        for entry_id in sorted(scores):
+            results.append((scores[entry_id], *_SEARCH_ENTRIES[entry_id]))
 
         # Try to fetch and search the main functions page for specific function names
         try:
-            functions_url = urljoin(BASE_URL, "functions.html")
-            soup = await self._fetch_page(functions_url)
-
-            # Find function links
-            for link in soup.find_all("a", href=True):
-                href = link.get("href", "")
-                if href.startswith("functions-") and href.endswith(".html"):
-                    # Skip category pages
-                    if any(href == cat["page"] for cat in FUNCTION_CATEGORIES.values()):
-                        continue
-
-                    func_name = link.get_text(strip=True)
-                    if not func_name:
-                        continue
+            index = await self._get_function_index()
+            func_scores: defaultdict[int, int] = defaultdict(int)
+            for word in query_words:
+                for func_id in index.names.containing(word):
+                    func_scores[func_id] += 5  # Higher weight for function name matches
+                for func_id in index.hrefs.containing(word):
+                    func_scores[func_id] += 2
 
-                    # Extract function name from URL as fallback
-                    if not func_name or func_name == href:
-                        func_name = href.replace("functions-", "").replace(".html", "")
-
-                    score = 0
-                    func_lower = func_name.lower()
-                    for word in query_words:
-                        if word in func_lower:
-                            score += 5  # Higher weight for function name matches
-                        if word in href.lower():
-                            score += 2
-
-                    if score > 0:
-                        results.append(
-                            {
-                                "type": "function",
-                                "name": func_name,
-                                "description": f"LogScale function: {func_name}",
-                                "url": urljoin(BASE_URL, href),
-                                "score": score,
-                            }
-                        )
+            for func_id in sorted(func_scores):
+                func_name = index.functions[func_id][0]
+                results.append(
+                    (
+                        func_scores[func_id],
+                        "function",
+                        func_name,
+                        f"LogScale function: {func_name}",
+                        index.urls[func_id],
+                    )
+                )
 
         except Exception:
             # Continue without function search if it fails
             pass
 
-        # Sort by score and limit results
-        results.sort(key=lambda x: x["score"], reverse=True)
+        # Keep each URL's best hit (highest score, then earliest), then take the top
+        # `limit` without sorting every candidate
+        best: dict[str, tuple[int, int]] = {}  # url -> (score, -position)
+        for position, (score, *_, url) in enumerate(results):
+            if url not in best or score > best[url][0]:
+                best[url] = (score, -position)
+        top = heapq.nlargest(limit, best.values())
 
-        # Remove score from output and deduplicate
-        seen_urls = set()
+        # Drop the score
         unique_results = []
-        for r in results:
-            if r["url"] not in seen_urls:
-                seen_urls.add(r["url"])
-                unique_results.append(
-                    {
-                        "type": r["type"],
-                        "name": r["name"],
-                        "description": r["description"],
-                        "url": r["url"],
-                    }
-                )
-                if len(unique_results) >= limit:
-                    break
+        for _, neg_position in top:
+            _, result_type, name, description, url = results[-neg_position]
+            unique_results.append(
+                {"type": result_type, "name": name, "description": description, "url": url}
+            )
 
         return {
             "query": query,
@@ -353,21 +561,14 @@ class LogscaleProvider(BaseProvider):
             matched_topic = topic_lower
             matched_info = SYNTAX_TOPICS[topic_lower]
         else:
-            # Partial match
-            for key, info in SYNTAX_TOPICS.items():
-                if topic_lower in key or key in topic_lower:
-                    matched_topic = key
-                    matched_info = info
-                    break
-                # Also check description
-                if topic_lower in info["description"].lower():
-                    matched_topic = key
-                    matched_info = info
-                    break
+            # Partial match on topic names and descriptions
+            matched_topic = _TOPIC_MATCHER.first(topic_lower)
+            if matched_topic:
+                matched_info = SYNTAX_TOPICS[matched_topic]
 
         if not matched_info:
             # List available topics
-            available = ", ".join(sorted(SYNTAX_TOPICS.keys()))
+            available = _AVAILABLE_TOPICS
             return {
                 "topic": topic,
                 "error": f"Topic not found. Available topics: {available}",
@@ -375,17 +576,15 @@ class LogscaleProvider(BaseProvider):
             }
 
         try:
-            url = urljoin(BASE_URL, matched_info["page"])
-            soup = await self._fetch_page(url)
-
-            # Extract main content
-            content = self._extract_main_content(soup, url, max_bytes)
+            url = matched_info["url"]
+            markdown, _ = await self._get_page_docs(url)
+            content = self._fit_content(markdown, max_bytes)
 
             return {
                 "topic": matched_topic,
                 "description": matched_info["description"],
                 "content": content,
-                "size_bytes": len(content.encode("utf-8")),
+                "size_bytes": utf8_len(content),
                 "url": url,
                 "source": "logscale_docs",
             }
@@ -423,22 +622,14 @@ class LogscaleProvider(BaseProvider):
         func_url = urljoin(BASE_URL, f"functions-{func_slug}.html")
 
         try:
-            soup = await self._fetch_page(func_url)
-
-            # Extract main content
-            content = self._extract_main_content(soup, func_url, max_bytes)
-
-            # Try to extract function signature from the page
-            signature = ""
-            sig_elem = soup.find("code", class_="code-highlight")
-            if sig_elem:
-                signature = sig_elem.get_text(strip=True)
+            markdown, signature = await self._get_page_docs(func_url)
+            content = self._fit_content(markdown, max_bytes)
 
             return {
                 "function": function_name,
                 "signature": signature,
                 "content": content,
-                "size_bytes": len(content.encode("utf-8")),
+                "size_bytes": utf8_len(content),
                 "url": func_url,
                 "source": "logscale_docs",
             }
@@ -479,8 +670,15 @@ class LogscaleProvider(BaseProvider):
                 "source": BASE_URL,
             }
 
-    async def _list_functions(self, category: str | None = None) -> dict[str, Any]:
-        """List available LogScale functions, optionally filtered by category."""
+    async def _list_functions(
+        self, category: str | None = None, expand: bool = False
+    ) -> dict[str, Any]:
+        """
+        List available LogScale functions, optionally filtered by category.
+
+        Without a category, lists the categories; expand=True also lists the
+        functions of every category.
+        """
         if category:
             cat_lower = category.lower().strip()
 
@@ -492,14 +690,12 @@ class LogscaleProvider(BaseProvider):
                 matched_cat = cat_lower
                 matched_info = FUNCTION_CATEGORIES[cat_lower]
             else:
-                for key, info in FUNCTION_CATEGORIES.items():
-                    if cat_lower in key or key in cat_lower:
-                        matched_cat = key
-                        matched_info = info
-                        break
+                matched_cat = _CATEGORY_MATCHER.first(cat_lower)
+                if matched_cat:
+                    matched_info = FUNCTION_CATEGORIES[matched_cat]
 
             if not matched_info:
-                available = ", ".join(sorted(FUNCTION_CATEGORIES.keys()))
+                available = _AVAILABLE_CATEGORIES
                 return {
                     "error": f"Category not found. Available: {available}",
                     "categories": list(FUNCTION_CATEGORIES.keys()),
@@ -508,34 +704,8 @@ class LogscaleProvider(BaseProvider):
 
             # Fetch category page to list functions
             try:
-                url = urljoin(BASE_URL, matched_info["page"])
-                soup = await self._fetch_page(url)
-
-                functions = []
-                # Find function entries in the category page
-                for link in soup.find_all("a", href=True):
-                    href = link.get("href", "")
-                    if href.startswith("functions-") and href.endswith(".html"):
-                        # Skip category pages
-                        if any(href == cat["page"] for cat in FUNCTION_CATEGORIES.values()):
-                            continue
-
-                        func_name = link.get_text(strip=True)
-                        if func_name and func_name != href:
-                            functions.append(
-                                {
-                                    "name": func_name,
-                                    "url": urljoin(BASE_URL, href),
-                                }
-                            )
-
-                # Deduplicate
-                seen = set()
-                unique_functions = []
-                for f in functions:
-                    if f["name"] not in seen:
-                        seen.add(f["name"])
-                        unique_functions.append(f)
+                url = matched_info["url"]
+                unique_functions = await self._get_category_functions(url)
 
                 return {
                     "category": matched_cat,
@@ -553,13 +723,16 @@ class LogscaleProvider(BaseProvider):
                     "source": BASE_URL,
                 }
 
+        if expand:
+            return await self._list_all_functions()
+
         # No category specified - return all categories
         return {
             "categories": [
                 {
                     "name": key,
                     "description": info["description"],
-                    "url": urljoin(BASE_URL, info["page"]),
+                    "url": info["url"],
                 }
                 for key, info in sorted(FUNCTION_CATEGORIES.items())
             ],
@@ -568,39 +741,102 @@ class LogscaleProvider(BaseProvider):
             "hint": "Use category parameter to list functions in a specific category",
         }
 
-    def _extract_main_content(self, soup: BeautifulSoup, base_url: str, max_bytes: int) -> str:
-        """Extract and process main content from a documentation page."""
-        # Make a copy to avoid modifying the original soup
-        from copy import copy
+    async def _list_all_functions(self) -> dict[str, Any]:
+        """List the functions of every category, fetching category pages concurrently."""
+        semaphore = asyncio.Semaphore(self.LIST_CONCURRENCY)
+        categories = sorted(FUNCTION_CATEGORIES.items())
+
+        async def fetch(info: dict[str, str]) -> list[dict[str, str]]:
+            async with semaphore:
+                return await self._get_category_functions(info["url"])
+
+        pages = await asyncio.gather(
+            *(fetch(info) for _, info in categories), return_exceptions=True
+        )
+
+        results = []
+        total_functions = 0
+        for (key, info), functions in zip(categories, pages, strict=True):
+            entry: dict[str, Any] = {
+                "name": key,
+                "description": info["description"],
+                "url": info["url"],
+            }
+            if isinstance(functions, BaseException):
+                entry["error"] = f"Failed to fetch category: {functions!s}"
+            else:
+                entry["functions"] = functions
+                entry["count"] = len(functions)
+                total_functions += len(functions)
+            results.append(entry)
+
+        return {
+            "categories": results,
+            "total_categories": len(results),
+            "total_functions": total_functions,
+            "source": BASE_URL,
+        }
+
+    async def _get_category_functions(self, url: str) -> list[dict[str, str]]:
+        """Return the unique functions linked from a category page, cached per URL."""
+        cache_enabled, _ = get_cache_config()
+        key = ("functions", url)
+        cached = self._page_cache.get(key) if cache_enabled else None
+        if cached is not None:
+            return cached
+
+        async def load() -> list[dict[str, str]]:
+            soup = await self._fetch_page(url)
 
-        soup = copy(soup)
+            functions = []
+            # Find function entries in the category page
+            for link in soup.find_all("a", href=_FUNC_HREF_RE):
+                href = link["href"]
+                # Skip category pages
+                if href in _CATEGORY_PAGES:
+                    continue
+
+                func_name = link.get_text(strip=True)
+                if func_name and func_name != href:
+                    functions.append(
+                        {
+                            "name": func_name,
+                            "url": urljoin(BASE_URL, href),
+                        }
+                    )
+
+            # Deduplicate
+            seen = set()
+            unique_functions = []
+            for f in functions:
+                if f["name"] not in seen:
+                    seen.add(f["name"])
+                    unique_functions.append(f)
+
+            if cache_enabled:
+                self._page_cache.set(key, unique_functions)
+            return unique_functions
+
+        # Concurrent lookups of the same category share one fetch and parse
+        return await self._coalesce(key, load)
+
+    def _extract_markdown(self, soup: BeautifulSoup, base_url: str) -> str:
+        """
+        Extract the main content of a documentation page as markdown.
 
+        Page chrome is decomposed in place, so soup must not be reused afterwards.
+        """
         # Remove unwanted elements first (before finding content)
         for unwanted in soup.find_all(
             ["nav", "aside", "footer", "header", "script", "style", "noscript"]
         ):
             unwanted.decompose()
 
-        # Remove elements by class patterns common in Humio docs
-        unwanted_patterns = [
-            "nav",
-            "sidebar",
-            "menu",
-            "breadcrumb",
-            "toc",
-            "footer",
-            "header",
-            "skip",
-            "social",
-            "share",
-            "cookie",
-            "banner",
-        ]
-        for pattern in unwanted_patterns:
-            for elem in soup.find_all(class_=lambda x, p=pattern: x and p in str(x).lower()):
-                elem.decompose()
-            for elem in soup.find_all(id=lambda x, p=pattern: x and p in str(x).lower()):
-                elem.decompose()
+        # Remove elements by class/id patterns common in Humio docs
+        for elem in soup.find_all(class_=lambda x: x and _UNWANTED_RE.search(str(x))):
+            elem.decompose()
+        for elem in soup.find_all(id=lambda x: x and _UNWANTED_RE.search(str(x))):
+            elem.decompose()
 
         # Try to find the main content area using multiple strategies
         main_content = None
@@ -645,12 +881,15 @@ class LogscaleProvider(BaseProvider):
         if title_elem:
             content_parts.append(f"## {title_elem.get_text(strip=True)}\n")
 
-        # Process content elements in order
-        for elem in main_content.find_all(
-            ["h1", "h2", "h3", "h4", "h5", "h6", "p", "table", "pre", "code", "ul", "ol", "dl"]
-        ):
+        # Select content elements in document order; one walk over the subtree with a
+        # set lookup per node is much cheaper than find_all() matching a tag-name list
+        elements = []
+        for elem in main_content.descendants:
+            if not isinstance(elem, Tag) or elem.name not in _CONTENT_TAGS:
+                continue
+
             # Skip if already processed as title
-            if elem == title_elem:
+            if elem is title_elem:
                 continue
 
             # Skip empty elements
@@ -668,9 +907,16 @@ class LogscaleProvider(BaseProvider):
                     if link_count / len(items) > 0.8 and avg_len < 50:
                         continue
 
-            # Convert element to markdown
-            elem_html = str(elem)
-            elem_md = html_to_markdown(elem_html, base_url)
+            elements.append(elem)
+
+        # With nothing but a short title the result below is known to fall back to
+        # whole-subtree conversion, so convert once instead of per element first
+        if not elements and len("".join(content_parts)) < MIN_ELEMENT_CONTENT:
+            return html_to_markdown(str(main_content), base_url)
+
+        # Convert each element to markdown
+        for elem in elements:
+            elem_md = html_to_markdown(str(elem), base_url)
             if elem_md.strip():
                 content_parts.append(elem_md)
 
@@ -678,27 +924,24 @@ class LogscaleProvider(BaseProvider):
         markdown_content = "\n\n".join(content_parts)
 
         # If we got very little content, try a simpler approach
-        if len(markdown_content) < 200:
+        if len(markdown_content) < MIN_ELEMENT_CONTENT:
             html_content = str(main_content)
             markdown_content = html_to_markdown(html_content, base_url)
 
+        return markdown_content
+
+    def _fit_content(self, markdown_content: str, max_bytes: int) -> str:
+        """Fit extracted markdown into max_bytes, keeping the most useful sections."""
         # Extract and prioritize sections
         sections = extract_sections(markdown_content)
         if sections:
             final_content = prioritize_sections(sections, max_bytes)
-        elif len(markdown_content.encode("utf-8")) > max_bytes:
+        elif markdown_content.isascii():
             # Simple truncation for content without sections
-            encoded = markdown_content.encode("utf-8")[:max_bytes]
-            while len(encoded) > 0:
-                try:
-                    final_content = encoded.decode("utf-8")
-                    break
-                except UnicodeDecodeError:
-                    encoded = encoded[:-1]
-            else:
-                final_content = ""
+            final_content = markdown_content[: max(max_bytes, 0)]
         else:
-            final_content = markdown_content
+            encoded = truncate_utf8(markdown_content.encode("utf-8"), max_bytes)
+            final_content = encoded.decode("utf-8")
 
         return final_content
 
@@ -719,15 +962,17 @@ class LogscaleProvider(BaseProvider):
 
         async def list_logscale_functions(
             category: str | None = None,
+            expand: bool = False,
         ) -> CallToolResult:
             """
             List LogScale functions by category. Without category, lists all categories.
 
             Categories: aggregate, array, string, math, time-date, regex, parsing, hash, etc.
-            Args: category="string" or category=None for all categories
+            Args: category="string" or category=None for all categories,
+                  expand=True to include the functions of every category
             Ex: list_logscale_functions("math") → math functions list
             """
-            result = await self._list_functions(category)
+            result = await self._list_functions(category, expand=expand)
             return serialize_response_with_meta(result)
 
         async def logscale_syntax(topic: str, max_bytes: int = 20480) -> CallToolResult:
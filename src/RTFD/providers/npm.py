@@ -2,33 +2,114 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
 from collections.abc import Callable
 from typing import Any
 
 import httpx
 from mcp.types import CallToolResult
 
+from ..cache import MemoryCache
 from ..content_utils import extract_sections, prioritize_sections
 from ..utils import (
     chunk_and_serialize_response,
+    get_cache_config,
     is_fetch_enabled,
+    normalize_repo_url,
     safe_json_loads,
     serialize_response_with_meta,
 )
 from .base import BaseProvider, ProviderMetadata, ProviderResult, ToolTierInfo
 
+try:
+    import msgspec
+except ImportError:  # Optional speedup, installed with the "speedups" extra
+    msgspec = None
+
+# (metadata key, registry document key) pairs copied through unchanged
+_METADATA_FIELDS = (
+    ("name", "name"),
+    ("version", "version"),
+    ("home_page", "homepage"),
+    ("docs_url", "homepage"),
+    ("license", "license"),
+    ("author", "author"),
+)
+
+if msgspec is not None:
+
+    class _RegistryDocument(msgspec.Struct):
+        """Registry document keys read by _parse_metadata; others are skipped unparsed."""
+
+        name: Any = msgspec.UNSET
+        description: Any = msgspec.UNSET
+        version: Any = msgspec.UNSET
+        homepage: Any = msgspec.UNSET
+        repository: Any = msgspec.UNSET
+        license: Any = msgspec.UNSET
+        keywords: Any = msgspec.UNSET
+        maintainers: Any = msgspec.UNSET
+        author: Any = msgspec.UNSET
+        readme: Any = msgspec.UNSET
+
+    _DOCUMENT_DECODER = msgspec.json.Decoder(_RegistryDocument)
+
+
+def _load_registry_document(content: bytes) -> dict[str, Any]:
+    """
+    Parse an npm registry document.
+
+    With msgspec installed, only the keys _parse_metadata reads are materialized;
+    the large "versions" and "time" objects are skipped during the parse. Keys
+    missing from the document are left out, as with a full parse.
+    """
+    if msgspec is not None:
+        try:
+            document = _DOCUMENT_DECODER.decode(content)
+        except msgspec.DecodeError:
+            pass  # e.g. unescaped control characters, which safe_json_loads tolerates
+        else:
+            return {
+                key: value
+                for key in _RegistryDocument.__struct_fields__
+                if (value := getattr(document, key)) is not msgspec.UNSET
+            }
+    return safe_json_loads(content)
+
 
 class NpmProvider(BaseProvider):
     """Provider for npm package registry metadata."""
 
+    METADATA_CACHE_TTL = 300.0  # Default seconds package metadata is reused (RTFD_NPM_CACHE_TTL)
+    METADATA_CACHE_SIZE = 1024
+    BULK_CONCURRENCY = 32  # Default bulk requests in flight (RTFD_NPM_CONCURRENCY)
+
+    def __init__(self, http_client_factory: Callable):
+        """Initialize provider with HTTP client factory and metadata cache."""
+        super().__init__(http_client_factory)
+        try:
+            ttl = float(os.getenv("RTFD_NPM_CACHE_TTL", str(self.METADATA_CACHE_TTL)))
+        except ValueError:
+            ttl = self.METADATA_CACHE_TTL
+        # package -> (ETag or None, metadata dict); expired entries are revalidated
+        self._metadata_cache = MemoryCache(ttl=ttl, maxsize=self.METADATA_CACHE_SIZE)
+        try:
+            concurrency = int(os.getenv("RTFD_NPM_CONCURRENCY", str(self.BULK_CONCURRENCY)))
+        except ValueError:
+            concurrency = self.BULK_CONCURRENCY
+        # Shared by all bulk calls, so parallel npm_metadata_bulk calls stay within the pool
+        self._bulk_semaphore = asyncio.Semaphore(max(concurrency, 1))
+
     def get_metadata(self) -> ProviderMetadata:
-        tool_names = ["npm_metadata"]
+        tool_names = ["npm_metadata", "npm_metadata_bulk"]
         if is_fetch_enabled():
             tool_names.append("fetch_npm_docs")
 
         # Tool tier classification for defer_loading recommendations
         tool_tiers = {
             "npm_metadata": ToolTierInfo(tier=2, defer_recommended=True, category="metadata"),
+            "npm_metadata_bulk": ToolTierInfo(tier=4, defer_recommended=True, category="metadata"),
             "fetch_npm_docs": ToolTierInfo(tier=3, defer_recommended=True, category="fetch"),
         }
 
@@ -39,7 +120,7 @@ class NpmProvider(BaseProvider):
             tool_names=tool_names,
             supports_library_search=True,
             required_env_vars=[],
-            optional_env_vars=[],
+            optional_env_vars=["RTFD_NPM_CACHE_TTL", "RTFD_NPM_CONCURRENCY"],
             tool_tiers=tool_tiers,
         )
 
@@ -59,14 +140,50 @@ class NpmProvider(BaseProvider):
             return ProviderResult(success=False, error=error_msg, provider_name="npm")
 
     async def _fetch_metadata(self, package: str) -> dict[str, Any]:
-        """Pull package metadata from the npm registry JSON API."""
-        url = f"https://registry.npmjs.org/{package}"
-        async with await self._http_client() as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            payload = safe_json_loads(resp.text)
+        """
+        Pull package metadata from the npm registry JSON API.
 
-        # Extract repository URL
+        Results are kept in memory for RTFD_NPM_CACHE_TTL seconds. Once an entry
+        expires it is revalidated with If-None-Match, so an unchanged package
+        costs a 304 instead of a full download.
+        """
+        cache_enabled, _ = get_cache_config()
+        cache_enabled = cache_enabled and self._metadata_cache.ttl > 0
+        stale = self._metadata_cache.peek(package) if cache_enabled else None
+        cached = self._metadata_cache.get(package) if stale is not None else None
+        if cached is not None:
+            return cached[1]
+
+        async def load() -> dict[str, Any]:
+            etag, metadata = await self._request_metadata(package, stale)
+            if cache_enabled:
+                self._metadata_cache.set(package, (etag, metadata))
+            return metadata
+
+        # Concurrent lookups of the same package share one request
+        return await self._coalesce(package, load)
+
+    async def _request_metadata(
+        self, package: str, stale: tuple[str | None, dict[str, Any]] | None
+    ) -> tuple[str | None, dict[str, Any]]:
+        """Request package metadata, revalidating a stale cache entry if there is one."""
+        url = f"https://registry.npmjs.org/{package}"
+        headers = {"If-None-Match": stale[0]} if stale is not None and stale[0] else None
+        client = await self._get_client()
+        resp = await client.get(url, headers=headers)
+        if headers is not None and resp.status_code == 304:
+            return stale
+        resp.raise_for_status()
+        # Parsed in one pass rather than streamed: "readme" comes after the large
+        # "versions"/"time" objects, so a streaming parser could never stop early.
+        # Only the projected fields outlive this call (and enter the cache).
+        payload = _load_registry_document(resp.content)
+        return resp.headers.get("etag"), self._parse_metadata(payload)
+
+    @staticmethod
+    def _parse_metadata(payload: dict[str, Any]) -> dict[str, Any]:
+        """Build the metadata dict returned to callers from a registry document."""
+        # Extract repository URL (object form first: it is the common shape)
         repo_url = None
         repository = payload.get("repository")
         if isinstance(repository, dict):
@@ -74,39 +191,55 @@ class NpmProvider(BaseProvider):
         elif isinstance(repository, str):
             repo_url = repository
 
-        # Clean up repository URL (remove git+ prefix and .git suffix if present)
-        if repo_url:
-            if repo_url.startswith("git+"):
-                repo_url = repo_url[4:]
-            if repo_url.endswith(".git"):
-                repo_url = repo_url[:-4]
+        # Extract maintainers
+        maintainers = [
+            {"name": maintainer.get("name"), "email": maintainer.get("email")}
+            for maintainer in payload.get("maintainers", [])
+            if isinstance(maintainer, dict)
+        ]
+
+        metadata = {key: payload.get(field) for key, field in _METADATA_FIELDS}
+        # Clean up repository URL (git+ prefix, .git suffix, ssh/git schemes)
+        metadata["repository"] = normalize_repo_url(repo_url)
+        metadata["summary"] = payload.get("description") or ""
+        metadata["keywords"] = payload.get("keywords", [])
+        metadata["maintainers"] = maintainers
+        metadata["readme"] = payload.get("readme", "")  # Include README for fetch_npm_docs
+        return metadata
+
+    async def _fetch_metadata_or_error(self, package: str) -> dict[str, Any]:
+        """Fetch package metadata, returning an error dict instead of raising."""
+        try:
+            return await self._fetch_metadata(package)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code == 404:
+                error = "Package not found on npm"
+            else:
+                error = f"npm registry returned {exc.response.status_code}"
+        except httpx.HTTPError as exc:
+            error = f"npm registry request failed: {exc}"
+        except Exception as exc:
+            error = f"Failed to fetch metadata: {exc!s}"
+        return {"package": package, "error": error}
 
-        # Extract documentation URL from links object or use homepage
-        docs_url = payload.get("homepage")
+    async def _fetch_packages_metadata(self, packages: list[str]) -> dict[str, Any]:
+        """Fetch metadata for several npm packages concurrently.
 
-        # Extract maintainers
-        maintainers = []
-        for maintainer in payload.get("maintainers", []):
-            if isinstance(maintainer, dict):
-                maintainers.append(
-                    {
-                        "name": maintainer.get("name"),
-                        "email": maintainer.get("email"),
-                    }
-                )
+        Args:
+            packages: Package names, as accepted by _fetch_metadata
 
+        Returns:
+            Dict with per-package metadata (or error) dicts, in request order
+        """
+
+        async def fetch(package: str) -> dict[str, Any]:
+            async with self._bulk_semaphore:
+                return await self._fetch_metadata_or_error(package)
+
+        results = await asyncio.gather(*(fetch(p) for p in packages))
         return {
-            "name": payload.get("name"),
-            "summary": payload.get("description") or "",
-            "version": payload.get("version"),
-            "home_page": payload.get("homepage"),
-            "docs_url": docs_url,
-            "repository": repo_url,
-            "license": payload.get("license"),
-            "keywords": payload.get("keywords", []),
-            "maintainers": maintainers,
-            "author": payload.get("author"),
-            "readme": payload.get("readme", ""),  # Include README for fetch_npm_docs
+            "count": len(results),
+            "packages": list(results),
         }
 
     async def _fetch_npm_docs(self, package: str, max_bytes: int = 20480) -> dict[str, Any]:
@@ -121,22 +254,16 @@ class NpmProvider(BaseProvider):
             Dict with content, size, source info
         """
         try:
-            url = f"https://registry.npmjs.org/{package}"
-
-            async with await self._http_client() as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-                data = safe_json_loads(resp.text)
+            # Shares the metadata cache, so docs after metadata costs no request
+            data = await self._fetch_metadata(package)
 
             # npm registry includes README in "readme" field (already Markdown)
-            content = data.get("readme", "")
+            content = data["readme"]
 
             # If no README or very short, note it
             source = "npm"
             if not content or len(content.strip()) < 100:
-                content = (
-                    f"# {package}\n\n{data.get('description', 'No description available.')}\n\n"
-                )
+                content = f"# {package}\n\n{data['summary'] or 'No description available.'}\n\n"
                 source = "npm_minimal"
 
             # Extract and prioritize sections
@@ -196,6 +323,17 @@ class NpmProvider(BaseProvider):
             result = await self._fetch_metadata(package)
             return serialize_response_with_meta(result)
 
+        async def npm_metadata_bulk(packages: list[str]) -> CallToolResult:
+            """
+            Get metadata for several npm packages in one call (fetched concurrently).
+
+            When: Comparing packages, e.g. axios vs got vs node-fetch
+            Args: packages=["express", "koa", "fastify"]
+            Ex: npm_metadata_bulk(["react", "vue"]) → list of versions and metadata
+            """
+            result = await self._fetch_packages_metadata(packages)
+            return serialize_response_with_meta(result)
+
         async def fetch_npm_docs(package: str, max_bytes: int = 20480) -> CallToolResult:
             """
             Fetch npm package README docs. Already in Markdown format.
@@ -208,7 +346,7 @@ class NpmProvider(BaseProvider):
             result = await self._fetch_npm_docs(package, max_bytes)
             return chunk_and_serialize_response(result)
 
-        tools = {"npm_metadata": npm_metadata}
+        tools = {"npm_metadata": npm_metadata, "npm_metadata_bulk": npm_metadata_bulk}
         if is_fetch_enabled():
             tools["fetch_npm_docs"] = fetch_npm_docs
 
@@ -8,9 +8,13 @@ in the aggregated search_library_docs tool.
 
 from __future__ import annotations
 
+import asyncio
 import sys
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from typing import Any
 
+import anyio
 from mcp.server.fastmcp import FastMCP
 from mcp.types import CallToolResult
 
@@ -20,8 +24,18 @@ from .providers import discover_providers
 from .providers.base import BaseProvider, ToolTierInfo
 from .utils import create_http_client, get_cache_config, serialize_response_with_meta
 
+
+@asynccontextmanager
+async def _lifespan(_server: FastMCP) -> AsyncIterator[None]:
+    """Close long-lived provider HTTP clients when the server shuts down."""
+    try:
+        yield
+    finally:
+        await _close_provider_clients()
+
+
 # Initialize FastMCP server
-mcp = FastMCP("RTFD!")
+mcp = FastMCP("RTFD!", lifespan=_lifespan)
 
 # Initialize Cache
 _cache_manager = CacheManager()
@@ -63,6 +77,15 @@ def _get_provider_instances() -> dict[str, BaseProvider]:
     return _provider_instances
 
 
+async def _close_provider_clients() -> None:
+    """Close the pooled HTTP clients held by provider instances."""
+    for name, provider in _provider_instances.items():
+        try:
+            await provider.aclose()
+        except Exception as e:
+            sys.stderr.write(f"Warning: Failed to close provider {name}: {e}\n")
+
+
 def get_all_tool_tiers() -> dict[str, ToolTierInfo]:
     """
     Get all tool tier information from all providers and server-level tools.
@@ -237,9 +260,25 @@ async def get_next_chunk(continuation_token: str) -> CallToolResult:
 _register_provider_tools()
 
 
+def _uvloop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Return uvloop's loop factory when installed (the "speedups" extra)."""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
 def run() -> None:
     """Entry point for console script."""
-    mcp.run()
+    loop_factory = _uvloop_factory()
+    if loop_factory is None:
+        mcp.run()
+        return
+    # Same as mcp.run() for stdio, but hands anyio the loop factory instead of
+    # using the event loop policy API deprecated in Python 3.14 (anyio backports
+    # asyncio.Runner's loop_factory to Python 3.10)
+    anyio.run(mcp.run_stdio_async, backend_options={"loop_factory": loop_factory})
 
 
 if __name__ == "__main__":
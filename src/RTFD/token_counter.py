@@ -2,10 +2,24 @@
 
 from __future__ import annotations
 
-import tiktoken
+import functools
+from typing import TYPE_CHECKING
 
-# Use cl100k_base encoding (used by GPT-4, Claude, and most modern LLMs)
-_encoding = tiktoken.get_encoding("cl100k_base")
+if TYPE_CHECKING:
+    import tiktoken
+
+
+@functools.cache
+def get_encoding() -> tiktoken.Encoding:
+    """
+    Return the cl100k_base encoding (used by GPT-4, Claude, and most modern LLMs).
+
+    Loaded on first use rather than at import: tiktoken reads (and on a fresh
+    machine downloads) the BPE ranks, which metadata-only tool calls never need.
+    """
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
 
 
 def count_tokens(text: str) -> int:
@@ -18,4 +32,4 @@ def count_tokens(text: str) -> int:
     Returns:
         Number of tokens
     """
-    return len(_encoding.encode(text))
+    return len(get_encoding().encode(text))
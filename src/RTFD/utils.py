@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 import shutil
+import ssl
 import subprocess
 from typing import Any
 
@@ -14,53 +16,164 @@ from mcp.types import CallToolResult, TextContent
 
 from .token_counter import count_tokens
 
+try:
+    import orjson
+except ImportError:  # Optional speedup, installed with the "speedups" extra
+    orjson = None
 
-def safe_json_loads(text: str) -> Any:
-    """Parse JSON with tolerance for control characters in strings."""
+try:
+    import h2  # noqa: F401
+except ImportError:  # Pulled in by httpx[http2]; without it httpx rejects http2=True
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+
+def safe_json_loads(text: str | bytes) -> Any:
+    """
+    Parse JSON with tolerance for control characters in strings.
+
+    Uses orjson when installed; pass raw response bytes (resp.content) to also
+    skip decoding the body to str. Falls back to the stdlib parser, which
+    accepts the unescaped control characters orjson rejects.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
     try:
         return json.loads(text)
     except json.JSONDecodeError:
         return json.loads(text, strict=False)
 
 
+@functools.lru_cache(maxsize=4096)
+def normalize_repo_url(url: str | None) -> str | None:
+    """
+    Normalize a package manifest repository URL to a browsable https URL.
+
+    Strips the "git+" prefix and ".git" suffix, and rewrites git://, ssh://git@host/
+    and scp-style git@host:path URLs to https://host/path. Memoized, since many
+    packages point at the same repositories.
+    """
+    if not url:
+        return url
+    url = url.removeprefix("git+").removesuffix(".git")
+    if url.startswith("git://"):
+        return "https://" + url.removeprefix("git://")
+    if url.startswith("ssh://"):
+        # Drop the user and port from the host part only; "@" may appear in the path
+        host, sep, path = url.removeprefix("ssh://").partition("/")
+        host = host.rpartition("@")[2].partition(":")[0]
+        return f"https://{host}{sep}{path}"
+    if url.startswith("git@") and ":" in url:
+        host, _, path = url.removeprefix("git@").partition(":")
+        return f"https://{host}/{path}"
+    return url
+
+
 USER_AGENT = (
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/118.0 Safari/537.36"
 )
 DEFAULT_TIMEOUT = 15.0
+DEFAULT_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
 
 
+@functools.lru_cache(maxsize=1)
 def is_fetch_enabled() -> bool:
     """
     Check if documentation content fetching is enabled.
 
     Controlled by RTFD_FETCH environment variable (default: true).
     Set to 'false', '0', or 'no' to disable.
+
+    The environment is read once per process, like the tool registration it
+    gates. Call reload_env() after changing RTFD_FETCH at runtime.
     """
     fetch_enabled = os.getenv("RTFD_FETCH", "true").lower()
     return fetch_enabled not in ("false", "0", "no")
 
 
+@functools.lru_cache(maxsize=1)
+def is_token_tracking_enabled() -> bool:
+    """
+    Check if token statistics should be attached to tool responses.
+
+    Controlled by RTFD_TRACK_TOKENS environment variable (default: false).
+    Read once per process, since every tool response consults it.
+    """
+    return os.getenv("RTFD_TRACK_TOKENS", "false").lower() == "true"
+
+
+def reload_env() -> None:
+    """Re-read the cached RTFD_FETCH and RTFD_TRACK_TOKENS settings."""
+    is_fetch_enabled.cache_clear()
+    is_token_tracking_enabled.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    """
+    Build the TLS context shared by every client.
+
+    Loading the CA bundle dominates client construction (tens of milliseconds),
+    and providers that open a client per request would otherwise pay it each time.
+    SSL_CERT_FILE / SSL_CERT_DIR are honoured as of the first client created.
+    """
+    return httpx.create_ssl_context()
+
+
 async def create_http_client() -> httpx.AsyncClient:
     """
     Create a configured HTTP client for provider use.
 
-    Centralizes timeout, user-agent, and redirect configuration.
+    Centralizes timeout, user-agent, redirect, TLS and connection pool configuration.
+    HTTP/2 is negotiated where the upstream supports it, provided the h2 package
+    is installed; otherwise the client speaks HTTP/1.1. httpx advertises and
+    decodes gzip/deflate, plus brotli when installed with the "speedups" extra.
     """
     return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        verify=_ssl_context(),
         timeout=DEFAULT_TIMEOUT,
+        limits=DEFAULT_LIMITS,
         follow_redirects=True,
         headers={"User-Agent": USER_AGENT, "Accept": "*/*"},
     )
 
 
-def serialize_response(data: Any) -> str:
+def serialize_response_bytes(data: Any) -> bytes:
+    """
+    Convert data to compact UTF-8 encoded JSON.
+
+    Uses orjson when installed, which writes UTF-8 directly. Payloads orjson
+    rejects (integers wider than 64 bits, lone surrogates) fall back to the
+    stdlib encoder with ASCII escaping. Unknown types are stringified.
+
+    Use this where bytes are accepted; MCP text content needs str, so tool
+    responses go through serialize_response() and decode once.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=True, separators=(",", ":"), default=str).encode()
+
+
+def serialize_response(data: Any, *, force_json: bool = False) -> str:
     """
     Convert data to string format.
 
-    Uses JSON with proper escape handling for control characters.
+    Uses JSON with proper escape handling for control characters. Text that is
+    already a str is returned unchanged unless force_json=True, which encodes it
+    as a quoted JSON string.
     """
-    return json.dumps(data, ensure_ascii=True, default=str)
+    if isinstance(data, str) and not force_json:
+        return data
+    return serialize_response_bytes(data).decode()
 
 
 def serialize_response_with_meta(data: Any) -> CallToolResult:
@@ -81,12 +194,11 @@ def serialize_response_with_meta(data: Any) -> CallToolResult:
           - content: Serialized data in JSON format
           - _meta: Token statistics (only if tracking enabled)
     """
-    track_tokens = os.getenv("RTFD_TRACK_TOKENS", "false").lower() == "true"
-
-    response_text = json.dumps(data, ensure_ascii=True, default=str)
+    response_bytes = serialize_response_bytes(data)
+    response_text = response_bytes.decode()
 
     # If token tracking is disabled, just serialize to JSON
-    if not track_tokens:
+    if not is_token_tracking_enabled():
         return CallToolResult(content=[TextContent(type="text", text=response_text)])
 
     # Token tracking enabled
@@ -98,7 +210,7 @@ def serialize_response_with_meta(data: Any) -> CallToolResult:
             "tokens_json": token_count,
             "tokens_sent": token_count,
             "format": "json",
-            "bytes_json": len(response_text),
+            "bytes_json": len(response_bytes),
         }
 
         # Return CallToolResult with content and metadata
@@ -174,8 +286,9 @@ def chunk_and_serialize_response(
     # Content needs chunking (chunking_manager should be available at this point)
 
     # Split content at token boundary
-    from .token_counter import _encoding
+    from .token_counter import get_encoding
 
+    _encoding = get_encoding()
     tokens = _encoding.encode(content)
     first_chunk_tokens = tokens[:chunk_size]
     remaining_tokens = tokens[chunk_size:]
@@ -4,7 +4,7 @@ import time
 
 import pytest
 
-from src.RTFD.cache import CacheManager
+from src.RTFD.cache import CacheManager, MemoryCache
 
 
 @pytest.fixture
@@ -111,3 +111,56 @@ def test_cache_preview_content(cache_manager):
     entry = entries["search:requests:5"]
     assert "HTTP for Humans" in entry["content_preview"]
     assert "search:requests" in entry["content_preview"]
+
+
+def test_memory_cache_evicts_least_recently_used():
+    """Test MemoryCache drops the least recently used entry when full."""
+    cache = MemoryCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_memory_cache_expiry():
+    """Test MemoryCache entries expire after the TTL."""
+    cache = MemoryCache(ttl=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_memory_cache_peek_returns_expired_entries():
+    """Test MemoryCache.peek keeps expired values available for revalidation."""
+    cache = MemoryCache(ttl=0)
+    cache.set("a", 1)
+
+    assert cache.peek("a") == 1
+    assert cache.get("a") is None
+    assert cache.peek("a") is None
+
+
+def test_memory_cache_per_entry_ttl():
+    """Test MemoryCache.set can give one entry a shorter TTL than the cache default."""
+    cache = MemoryCache(ttl=60)
+    cache.set("a", 1, ttl=0)
+    cache.set("b", 2)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_memory_cache_retains_stale_entries():
+    """Test expired entries stay peekable for stale_ttl after get() misses."""
+    cache = MemoryCache(ttl=0, stale_ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert cache.peek("a") == 1
+    assert len(cache) == 1
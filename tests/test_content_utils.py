@@ -11,6 +11,8 @@ from src.RTFD.content_utils import (
     prioritize_sections,
     score_section,
     smart_truncate,
+    truncate_utf8,
+    utf8_len,
 )
 
 
@@ -135,6 +137,25 @@ def test_smart_truncate():
     assert "Sentence two" not in truncated2
 
 
+def test_truncate_utf8():
+    """Test byte truncation never splits a multi-byte character."""
+    encoded = "a\u00e9\u20ac\U0001f600".encode()  # 1 + 2 + 3 + 4 bytes
+
+    assert truncate_utf8(encoded, 20) == encoded
+    assert truncate_utf8(encoded, 1) == b"a"
+    assert truncate_utf8(encoded, 2) == b"a"
+    assert truncate_utf8(encoded, 5) == "a\u00e9".encode()
+    assert truncate_utf8(encoded, 9) == "a\u00e9\u20ac".encode()
+    assert truncate_utf8(encoded, 0) == b""
+
+
+def test_utf8_len():
+    """Test UTF-8 byte counting for ASCII and multi-byte text."""
+    assert utf8_len("") == 0
+    assert utf8_len("plain ascii") == 11
+    assert utf8_len("a\u00e9\u20ac\U0001f600") == 10
+
+
 def test_convert_relative_urls():
     """Test relative URL conversion."""
     base = "https://example.com/docs"
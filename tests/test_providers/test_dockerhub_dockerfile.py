@@ -1,6 +1,8 @@
+import asyncio
 import json
 from unittest.mock import AsyncMock, MagicMock
 
+import httpx
 import pytest
 
 from RTFD.providers.dockerhub import DockerHubProvider
@@ -14,6 +16,38 @@ def mock_http_client():
     return client
 
 
+def json_response(data):
+    """Build a mock 200 response carrying a JSON body."""
+    body = json.dumps(data)
+    return MagicMock(
+        status_code=200,
+        text=body,
+        content=body.encode("utf-8"),
+        json=MagicMock(return_value=data),
+        raise_for_status=MagicMock(),
+    )
+
+
+def stream_response(body: str, status_code: int = 200, chunk_size: int = 1024):
+    """Build a mock for `client.stream(...)` yielding body in chunks."""
+    response = MagicMock(status_code=status_code)
+    if status_code >= 400:
+        response.raise_for_status.side_effect = httpx.HTTPStatusError(
+            f"{status_code}", request=MagicMock(), response=response
+        )
+
+    async def aiter_bytes():
+        data = body.encode("utf-8")
+        for i in range(0, len(data), chunk_size):
+            yield data[i : i + chunk_size]
+
+    response.aiter_bytes = aiter_bytes
+    stream = MagicMock()
+    stream.__aenter__ = AsyncMock(return_value=response)
+    stream.__aexit__ = AsyncMock(return_value=None)
+    return stream
+
+
 @pytest.fixture
 def provider(mock_http_client):
     # The factory must be an async function or return an awaitable
@@ -28,25 +62,14 @@ async def test_fetch_dockerfile_success(provider, mock_http_client):
         "name": "python",
         "full_description": "Some text\n- [Dockerfile](https://github.com/docker-library/python/blob/master/3.11/slim/Dockerfile)\nMore text",
     }
-    metadata_response = MagicMock(
-        status_code=200,
-        text=json.dumps(metadata_data),
-        json=MagicMock(return_value=metadata_data),
-        raise_for_status=MagicMock(),
-    )
+    metadata_response = json_response(metadata_data)
 
-    mock_http_client.get.side_effect = [
-        # 1. _fetch_image_metadata call
-        metadata_response,
-        # 2. _fetch_dockerfile re-fetch call
-        metadata_response,
-        # 3. GitHub raw content call
-        MagicMock(
-            status_code=200,
-            text="FROM debian:bookworm-slim\nRUN apt-get update",
-            raise_for_status=MagicMock(),
-        ),
-    ]
+    # DockerHub repository payload (metadata + full_description)
+    mock_http_client.get.return_value = metadata_response
+    # GitHub raw content call
+    mock_http_client.stream = MagicMock(
+        return_value=stream_response("FROM debian:bookworm-slim\nRUN apt-get update")
+    )
 
     result = await provider._fetch_dockerfile("python")
 
@@ -57,9 +80,56 @@ async def test_fetch_dockerfile_success(provider, mock_http_client):
         == "https://raw.githubusercontent.com/docker-library/python/master/3.11/slim/Dockerfile"
     )
     assert result["found_in_description"] is True
+    assert result["truncated"] is False
 
-    # Verify calls
-    assert mock_http_client.get.call_count == 3
+    # Verify calls: the repository endpoint is only hit once
+    assert mock_http_client.get.call_count == 1
+    assert mock_http_client.stream.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_dockerfile_falls_back_to_next_candidate(provider, mock_http_client):
+    metadata_data = {
+        "name": "python",
+        "full_description": (
+            "- [Dockerfile](https://github.com/docker-library/python/blob/master/3.13/slim/Dockerfile)\n"
+            "- [Dockerfile](https://github.com/docker-library/python/blob/master/3.12/slim/Dockerfile)\n"
+            "- [Dockerfile](https://github.com/docker-library/python/blob/master/3.13/slim/Dockerfile)\n"
+        ),
+    }
+    metadata_response = json_response(metadata_data)
+    mock_http_client.get.return_value = metadata_response
+    mock_http_client.stream = MagicMock(
+        side_effect=[
+            stream_response("Not Found", status_code=404),
+            stream_response("FROM debian:bookworm-slim"),
+        ]
+    )
+
+    result = await provider._fetch_dockerfile("python")
+
+    assert result["content"] == "FROM debian:bookworm-slim"
+    assert result["source"].endswith("/3.12/slim/Dockerfile")
+    # Duplicate links are only probed once
+    assert mock_http_client.stream.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_dockerfile_caps_size(provider, mock_http_client):
+    metadata_data = {
+        "name": "python",
+        "full_description": "https://github.com/docker-library/python/blob/master/Dockerfile",
+    }
+    mock_http_client.get.return_value = json_response(metadata_data)
+    mock_http_client.stream = MagicMock(
+        return_value=stream_response("RUN true\n" * 1000, chunk_size=100)
+    )
+
+    result = await provider._fetch_dockerfile("python", max_bytes=250)
+
+    assert result["truncated"] is True
+    assert result["size_bytes"] == 250
+    assert result["content"] == ("RUN true\n" * 1000)[:250]
 
 
 @pytest.mark.asyncio
@@ -69,12 +139,7 @@ async def test_fetch_dockerfile_no_link(provider, mock_http_client):
         "name": "python",
         "full_description": "Just some description without links.",
     }
-    response = MagicMock(
-        status_code=200,
-        text=json.dumps(no_link_data),
-        json=MagicMock(return_value=no_link_data),
-        raise_for_status=MagicMock(),
-    )
+    response = json_response(no_link_data)
     mock_http_client.get.side_effect = [response, response]
 
     result = await provider._fetch_dockerfile("python")
@@ -103,3 +168,255 @@ async def test_tool_registration(provider):
     tools = provider.get_tools()
     assert "fetch_dockerfile" in tools
     assert callable(tools["fetch_dockerfile"])
+
+
+@pytest.mark.asyncio
+async def test_http_client_reused_across_calls(mock_http_client):
+    factory = AsyncMock(return_value=mock_http_client)
+    provider = DockerHubProvider(factory)
+    mock_http_client.get.return_value = json_response({"results": []})
+
+    await provider._search_images("nginx")
+    await provider._search_images("redis")
+
+    factory.assert_awaited_once()
+    mock_http_client.__aenter__.assert_not_called()
+
+    await provider.aclose()
+    mock_http_client.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_image_metadata_is_cached(provider, mock_http_client):
+    mock_http_client.get.return_value = json_response({"name": "nginx", "namespace": "library"})
+
+    first = await provider._fetch_image_metadata("nginx")
+    second = await provider._fetch_image_metadata("library/nginx")
+
+    assert first == second
+    assert mock_http_client.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_image_not_found_is_cached(provider, mock_http_client):
+    response = MagicMock(status_code=404)
+    response.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "404 Not Found", request=MagicMock(), response=response
+    )
+    mock_http_client.get.return_value = response
+
+    for _ in range(2):
+        result = await provider._fetch_image_metadata("does-not-exist")
+        assert result["error"] == "Image not found on DockerHub"
+
+    assert mock_http_client.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_image_metadata_cache_disabled(provider, mock_http_client, monkeypatch):
+    monkeypatch.setenv("RTFD_CACHE_ENABLED", "false")
+    mock_http_client.get.return_value = json_response({"name": "nginx"})
+
+    await provider._fetch_image_metadata("nginx")
+    await provider._fetch_image_metadata("nginx")
+
+    assert mock_http_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_image_docs_truncates_by_bytes(provider, mock_http_client):
+    mock_http_client.get.return_value = json_response(
+        {"name": "nginx", "description": "", "readme": "é" * 100}
+    )
+
+    # "## README\n\n" is 11 bytes, so byte 50 falls in the middle of an "é"
+    result = await provider._fetch_image_docs("nginx", max_bytes=50)
+
+    assert result["truncated"] is True
+    assert result["size_bytes"] == len(result["content"].encode("utf-8")) == 49
+
+
+@pytest.mark.asyncio
+async def test_fetch_images_metadata(provider, mock_http_client):
+    def respond(url):
+        name = url.rstrip("/").rsplit("/", 1)[-1]
+        if name == "missing":
+            response = MagicMock(status_code=404)
+            response.raise_for_status.side_effect = httpx.HTTPStatusError(
+                "404 Not Found", request=MagicMock(), response=response
+            )
+            return response
+        return json_response({"name": name, "namespace": "library"})
+
+    mock_http_client.get.side_effect = respond
+
+    result = await provider._fetch_images_metadata(["nginx", "missing", "redis"])
+
+    assert result["count"] == 3
+    assert [r.get("name") for r in result["images"]] == ["nginx", None, "redis"]
+    assert result["images"][1]["error"] == "Image not found on DockerHub"
+    assert "docker_images_metadata" in provider.get_tools()
+
+
+@pytest.mark.asyncio
+async def test_fetch_images_metadata_bounds_concurrency(mock_http_client, monkeypatch):
+    """Bulk lookups keep at most RTFD_DOCKERHUB_CONCURRENCY requests in flight."""
+    monkeypatch.setenv("RTFD_DOCKERHUB_CONCURRENCY", "2")
+    in_flight = peak = 0
+
+    async def get(url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return json_response({"name": url.rstrip("/").rsplit("/", 1)[-1]})
+
+    mock_http_client.get.side_effect = get
+    provider = DockerHubProvider(AsyncMock(return_value=mock_http_client))
+
+    result = await provider._fetch_images_metadata([f"image-{i}" for i in range(6)])
+
+    assert result["count"] == 6
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_search_images_formats_results(provider, mock_http_client):
+    payload = {
+        "results": [
+            {"repo_name": "nginx", "repo_owner": "", "is_official": True, "star_count": 10},
+            {"repo_name": "nginx", "repo_owner": "bitnami", "short_description": "Bitnami"},
+        ]
+    }
+    mock_http_client.get.return_value = json_response(payload)
+
+    result = await provider._search_images("nginx")
+
+    assert result["count"] == 2
+    official, community = result["results"]
+    assert official["owner"] == "library"
+    assert official["url"] == "https://hub.docker.com/r/library/nginx"
+    assert official["is_official"] is True
+    assert community["url"] == "https://hub.docker.com/r/bitnami/nginx"
+    assert community["description"] == "Bitnami"
+    assert community["pull_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_image_docs_ascii(provider, mock_http_client):
+    mock_http_client.get.return_value = json_response(
+        {"name": "nginx", "description": "Web server", "readme": "x" * 100}
+    )
+
+    result = await provider._fetch_image_docs("nginx", max_bytes=50)
+    assert result["truncated"] is True
+    assert result["size_bytes"] == len(result["content"]) == 50
+
+    result = await provider._fetch_image_docs("nginx")
+    assert result["truncated"] is False
+    assert result["content"] == "## Description\n\nWeb server\n\n## README\n\n" + "x" * 100
+    assert result["size_bytes"] == len(result["content"])
+
+
+def _expire_cache(provider, repo_path, age):
+    stored_at, ttl, value = provider._meta_cache._entries[repo_path]
+    provider._meta_cache._entries[repo_path] = (stored_at - age, ttl, value)
+
+
+@pytest.mark.asyncio
+async def test_image_metadata_served_stale_when_rate_limited(provider, mock_http_client):
+    mock_http_client.get.return_value = json_response({"name": "nginx", "star_count": 5})
+    fresh = await provider._fetch_image_metadata("nginx")
+    assert "stale" not in fresh
+
+    _expire_cache(provider, "library/nginx", provider.METADATA_CACHE_TTL + 1)
+    rate_limited = MagicMock(status_code=429)
+    rate_limited.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "429 Too Many Requests", request=MagicMock(), response=rate_limited
+    )
+    mock_http_client.get.return_value = rate_limited
+
+    result = await provider._fetch_image_metadata("nginx")
+
+    assert result["stale"] is True
+    assert result["star_count"] == 5
+    assert mock_http_client.get.call_count == 2
+
+    # The fallback stays available while DockerHub keeps failing
+    result = await provider._fetch_image_metadata("nginx")
+    assert result["stale"] is True
+    assert mock_http_client.get.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_image_metadata_not_served_past_stale_ttl(provider, mock_http_client):
+    mock_http_client.get.return_value = json_response({"name": "nginx"})
+    await provider._fetch_image_metadata("nginx")
+
+    _expire_cache(provider, "library/nginx", provider.METADATA_STALE_TTL + 1)
+    mock_http_client.get.side_effect = httpx.ConnectError("unreachable")
+
+    result = await provider._fetch_image_metadata("nginx")
+
+    assert result["error"].startswith("DockerHub request failed")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_image_lookups_share_one_request(provider, mock_http_client):
+    async def slow_get(url):
+        await asyncio.sleep(0.01)
+        return json_response({"name": "nginx"})
+
+    mock_http_client.get.side_effect = slow_get
+
+    results = await asyncio.gather(
+        provider._fetch_image_metadata("nginx"),
+        provider._fetch_image_docs("nginx"),
+        provider._fetch_image_metadata("library/nginx"),
+    )
+
+    assert results[0]["name"] == "nginx"
+    assert results[1]["source"] == "dockerhub"
+    assert mock_http_client.get.call_count == 1
+    assert provider._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_search_images_errors(provider, mock_http_client):
+    server_error = MagicMock(status_code=500)
+    server_error.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "500", request=MagicMock(), response=server_error
+    )
+    mock_http_client.get.side_effect = [
+        server_error,
+        httpx.ConnectError("unreachable"),
+        ValueError("bad payload"),
+    ]
+
+    errors = [(await provider._search_images("nginx"))["error"] for _ in range(3)]
+
+    assert errors == [
+        "DockerHub returned 500",
+        "DockerHub request failed: unreachable",
+        "Failed to search images: bad payload",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_image_not_found_expires_after_negative_ttl(provider, mock_http_client):
+    response = MagicMock(status_code=404)
+    response.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "404 Not Found", request=MagicMock(), response=response
+    )
+    mock_http_client.get.return_value = response
+    await provider._fetch_image_metadata("does-not-exist")
+
+    _expire_cache(provider, "library/does-not-exist", provider.METADATA_NEGATIVE_TTL + 1)
+    mock_http_client.get.side_effect = httpx.ConnectError("unreachable")
+
+    result = await provider._fetch_image_metadata("does-not-exist")
+
+    # The expired 404 is refetched, and never used as a stale fallback
+    assert result["error"].startswith("DockerHub request failed")
+    assert mock_http_client.get.call_count == 2
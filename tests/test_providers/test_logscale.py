@@ -1,18 +1,61 @@
 """Tests for LogScale provider."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import httpx
 import pytest
+from bs4 import BeautifulSoup
 
+from src.RTFD.providers import logscale
 from src.RTFD.providers.logscale import (
+    _CATEGORY_MATCHER,
+    _SEARCH_ENTRIES,
+    _SEARCH_INDEX,
+    _TOPIC_MATCHER,
     FUNCTION_CATEGORIES,
     SYNTAX_TOPICS,
     LogscaleProvider,
+    _JoinedText,
 )
 from src.RTFD.utils import create_http_client
 
 
+def page_client(*pages, delay=0.0):
+    """
+    Return a mock HTTP client whose streamed GETs serve pages in order.
+
+    Each page is an HTML string or an HTTP error status code; the last one repeats.
+    """
+    responses = []
+    for page in pages:
+        response = MagicMock()
+        if isinstance(page, int):
+            response.raise_for_status.side_effect = httpx.HTTPStatusError(
+                str(page), request=MagicMock(), response=MagicMock(status_code=page)
+            )
+        else:
+
+            async def aiter_bytes(body=page):
+                await asyncio.sleep(delay)
+                yield body.encode("utf-8")
+
+            response.aiter_bytes = aiter_bytes
+        responses.append(response)
+
+    def stream(method, url, **kwargs):
+        response = responses.pop(0) if len(responses) > 1 else responses[0]
+        ctx = MagicMock()
+        ctx.__aenter__ = AsyncMock(return_value=response)
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        return ctx
+
+    client = MagicMock()
+    client.stream = MagicMock(side_effect=stream)
+    client.aclose = AsyncMock()
+    return client
+
+
 @pytest.fixture
 def provider():
     """Create a LogScale provider instance."""
@@ -118,17 +161,55 @@ async def test_search_docs_function_categories(provider):
     assert any("aggregate" in r["name"] for r in category_results)
 
 
+@pytest.mark.parametrize("word", ["regex", "agg", "time", "e", "(count,", "nomatch"])
+def test_search_index_matches_substring_scan(word):
+    """Test the inverted index scores exactly like a substring scan."""
+    expected = {}
+    for i, (_, name, description, _) in enumerate(_SEARCH_ENTRIES):
+        score = 3 * (word in name) + (word in description.lower())
+        if score:
+            expected[i] = score
+
+    actual = {}
+    for i, weight in _SEARCH_INDEX.get(word, ()):
+        actual[i] = actual.get(i, 0) + weight
+    assert actual == expected
+
+
+@pytest.mark.parametrize("word", ["a", "regex", "ex", "array:", "", "zzz"])
+def test_joined_text_containing_matches_substring_scan(word):
+    """Test joined-text lookup finds the same values as a per-value scan."""
+    values = ["regex", "array:regex", "", "replace", "splitstring", "aa"]
+    joined = _JoinedText(values)
+
+    assert joined.containing(word) == [i for i, v in enumerate(values) if word and word in v]
+
+
+@pytest.mark.parametrize(
+    "query", ["regex flags", "timezones list", "regular", "rex", "my time-date", "xyz", ""]
+)
+def test_key_matchers_match_first_related_key(query):
+    """Test partial topic/category resolution picks the first related key in order."""
+    expected_topic = next(
+        (
+            key
+            for key, info in SYNTAX_TOPICS.items()
+            if query in key or key in query or query in info["description"].lower()
+        ),
+        None,
+    )
+    expected_category = next(
+        (key for key in FUNCTION_CATEGORIES if query in key or key in query), None
+    )
+
+    assert _TOPIC_MATCHER.first(query) == expected_topic
+    assert _CATEGORY_MATCHER.first(query) == expected_category
+
+
 @pytest.mark.asyncio
 async def test_search_docs_with_functions_page(provider, mock_functions_page):
     """Test searching docs includes function names from page."""
-    mock_response = MagicMock()
-    mock_response.text = mock_functions_page
-    mock_response.raise_for_status.return_value = None
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__.return_value = mock_client
-    mock_client.__aexit__.return_value = None
+    mock_client = page_client(mock_functions_page)
 
     async def mock_factory():
         return mock_client
@@ -141,6 +222,48 @@ async def test_search_docs_with_functions_page(provider, mock_functions_page):
     assert len(function_results) > 0
 
 
+@pytest.mark.asyncio
+async def test_search_docs_dedupes_and_limits(mock_functions_page):
+    """Test duplicate links collapse to one hit and the best hits come first."""
+    page = mock_functions_page.replace(
+        "</ul>", '<li><a href="functions-regex.html">regex()</a></li></ul>'
+    )
+    mock_client = page_client(page)
+
+    async def mock_factory():
+        return mock_client
+
+    provider = LogscaleProvider(mock_factory)
+    result = await provider._search_docs("regex", limit=3)
+
+    urls = [r["url"] for r in result["results"]]
+    assert len(urls) == 3
+    assert len(set(urls)) == 3
+    # Function name + href hits (7) outrank topic/category key hits
+    assert result["results"][0] == {
+        "type": "function",
+        "name": "regex()",
+        "description": "LogScale function: regex()",
+        "url": "https://library.humio.com/data-analysis/functions-regex.html",
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_docs_reuses_function_index(mock_functions_page):
+    """Test the parsed functions page is fetched once across searches."""
+    mock_client = page_client(mock_functions_page)
+
+    async def mock_factory():
+        return mock_client
+
+    provider = LogscaleProvider(mock_factory)
+    first = await provider._search_docs("regex", limit=10)
+    second = await provider._search_docs("regex", limit=10)
+
+    assert second == first
+    assert mock_client.stream.call_count == 1
+
+
 @pytest.mark.asyncio
 async def test_list_functions_all_categories(provider):
     """Test listing all function categories."""
@@ -159,14 +282,7 @@ async def test_list_functions_all_categories(provider):
 @pytest.mark.asyncio
 async def test_list_functions_by_category(provider, mock_html_content):
     """Test listing functions in a specific category."""
-    mock_response = MagicMock()
-    mock_response.text = mock_html_content
-    mock_response.raise_for_status.return_value = None
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__.return_value = mock_client
-    mock_client.__aexit__.return_value = None
+    mock_client = page_client(mock_html_content)
 
     async def mock_factory():
         return mock_client
@@ -178,6 +294,32 @@ async def test_list_functions_by_category(provider, mock_html_content):
     assert "functions" in result
 
 
+@pytest.mark.asyncio
+async def test_list_functions_expand_all(provider, monkeypatch):
+    """Test expand=True lists every category's functions with bounded concurrency."""
+    active = peak = 0
+
+    async def fake_category_functions(url):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.001)
+        active -= 1
+        if url.endswith("functions-hash-functions.html"):
+            raise httpx.ConnectError("boom")
+        return [{"name": "f()", "url": url}]
+
+    monkeypatch.setattr(provider, "_get_category_functions", fake_category_functions)
+    result = await provider._list_functions(expand=True)
+
+    assert result["total_categories"] == len(FUNCTION_CATEGORIES)
+    assert result["total_functions"] == len(FUNCTION_CATEGORIES) - 1
+    assert peak <= provider.LIST_CONCURRENCY
+    by_name = {c["name"]: c for c in result["categories"]}
+    assert "error" in by_name["hash"]
+    assert by_name["math"]["functions"] == [{"name": "f()", "url": by_name["math"]["url"]}]
+
+
 @pytest.mark.asyncio
 async def test_list_functions_invalid_category(provider):
     """Test listing functions with invalid category."""
@@ -191,14 +333,7 @@ async def test_list_functions_invalid_category(provider):
 @pytest.mark.asyncio
 async def test_fetch_syntax_docs_success(provider, mock_html_content):
     """Test fetching syntax documentation."""
-    mock_response = MagicMock()
-    mock_response.text = mock_html_content
-    mock_response.raise_for_status.return_value = None
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__.return_value = mock_client
-    mock_client.__aexit__.return_value = None
+    mock_client = page_client(mock_html_content)
 
     async def mock_factory():
         return mock_client
@@ -212,6 +347,88 @@ async def test_fetch_syntax_docs_success(provider, mock_html_content):
     assert "error" not in result
 
 
+@pytest.mark.asyncio
+async def test_fetch_syntax_docs_reuses_cached_page(mock_html_content):
+    """Test repeated syntax lookups are served from the page cache."""
+    mock_client = page_client(mock_html_content)
+
+    async def mock_factory():
+        return mock_client
+
+    provider = LogscaleProvider(mock_factory)
+    first = await provider._fetch_syntax_docs("regex", max_bytes=20480)
+    small = await provider._fetch_syntax_docs("regex", max_bytes=100)
+
+    assert mock_client.stream.call_count == 1
+    assert small["size_bytes"] <= 100 < first["size_bytes"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_syntax_docs_coalesces_concurrent_fetches(mock_html_content, monkeypatch):
+    """Test concurrent lookups of one page share a single request."""
+    monkeypatch.setenv("RTFD_CACHE_ENABLED", "false")
+    mock_client = page_client(mock_html_content, delay=0.01)
+
+    async def mock_factory():
+        return mock_client
+
+    provider = LogscaleProvider(mock_factory)
+    results = await asyncio.gather(*(provider._fetch_syntax_docs("regex") for _ in range(3)))
+
+    assert mock_client.stream.call_count == 1
+    assert all(r == results[0] for r in results)
+    assert provider._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_fetches_share_one_http_client(mock_html_content):
+    """Test page fetches reuse the provider's long-lived client."""
+    mock_client = page_client(mock_html_content)
+    mock_factory = AsyncMock(return_value=mock_client)
+
+    provider = LogscaleProvider(mock_factory)
+    await provider._fetch_syntax_docs("regex")
+    await provider._fetch_function_docs("regex")
+
+    assert mock_client.stream.call_count == 2
+    mock_factory.assert_awaited_once()
+    mock_client.aclose.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_caps_body_size(monkeypatch):
+    """Test oversized pages are cut off instead of read fully."""
+    monkeypatch.setattr(LogscaleProvider, "MAX_PAGE_BYTES", 40)
+    mock_client = page_client("<html><body><p>" + "x" * 1000 + "</p></body></html>")
+
+    async def mock_factory():
+        return mock_client
+
+    provider = LogscaleProvider(mock_factory)
+    soup = await provider._fetch_page("https://example.com/big.html")
+
+    assert 0 < len(soup.get_text()) < 40
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parser", ["lxml", "html.parser"])
+async def test_fetch_syntax_docs_parser(parser, mock_html_content, monkeypatch):
+    """Test extraction works with lxml and with the stdlib fallback parser."""
+    if parser == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setattr(logscale, "HTML_PARSER", parser)
+    mock_client = page_client(mock_html_content)
+
+    async def mock_factory():
+        return mock_client
+
+    provider = LogscaleProvider(mock_factory)
+    result = await provider._fetch_syntax_docs("regex", max_bytes=20480)
+
+    assert "regex()" in result["content"]
+    assert 'regex("error.*timeout")' in result["content"]
+
+
 @pytest.mark.asyncio
 async def test_fetch_syntax_docs_invalid_topic(provider):
     """Test fetching syntax docs for invalid topic."""
@@ -224,14 +441,7 @@ async def test_fetch_syntax_docs_invalid_topic(provider):
 @pytest.mark.asyncio
 async def test_fetch_function_docs_success(provider, mock_html_content):
     """Test fetching function documentation."""
-    mock_response = MagicMock()
-    mock_response.text = mock_html_content
-    mock_response.raise_for_status.return_value = None
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__.return_value = mock_client
-    mock_client.__aexit__.return_value = None
+    mock_client = page_client(mock_html_content)
 
     async def mock_factory():
         return mock_client
@@ -248,14 +458,7 @@ async def test_fetch_function_docs_success(provider, mock_html_content):
 @pytest.mark.asyncio
 async def test_fetch_function_docs_namespaced(provider, mock_html_content):
     """Test fetching docs for namespaced function like array:append."""
-    mock_response = MagicMock()
-    mock_response.text = mock_html_content
-    mock_response.raise_for_status.return_value = None
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__.return_value = mock_client
-    mock_client.__aexit__.return_value = None
+    mock_client = page_client(mock_html_content)
 
     async def mock_factory():
         return mock_client
@@ -266,8 +469,8 @@ async def test_fetch_function_docs_namespaced(provider, mock_html_content):
     await provider._fetch_function_docs("array:append", max_bytes=20480)
 
     # Verify the URL was constructed correctly (via the mock call)
-    call_args = mock_client.get.call_args
-    url = call_args[0][0]
+    call_args = mock_client.stream.call_args
+    url = call_args[0][1]
     assert "functions-array-append.html" in url
 
 
@@ -275,19 +478,7 @@ async def test_fetch_function_docs_namespaced(provider, mock_html_content):
 async def test_fetch_function_docs_404_with_suggestions(provider, mock_functions_page):
     """Test fetching docs for nonexistent function provides suggestions."""
     # First call returns 404, second call (search) returns function list
-    mock_404_response = MagicMock()
-    mock_404_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "404", request=MagicMock(), response=MagicMock(status_code=404)
-    )
-
-    mock_search_response = MagicMock()
-    mock_search_response.text = mock_functions_page
-    mock_search_response.raise_for_status.return_value = None
-
-    mock_client = AsyncMock()
-    mock_client.get.side_effect = [mock_404_response, mock_search_response]
-    mock_client.__aenter__.return_value = mock_client
-    mock_client.__aexit__.return_value = None
+    mock_client = page_client(404, mock_functions_page)
 
     async def mock_factory():
         return mock_client
@@ -304,15 +495,7 @@ async def test_fetch_function_docs_404_with_suggestions(provider, mock_functions
 @pytest.mark.asyncio
 async def test_fetch_function_http_error(provider):
     """Test handling of HTTP errors when fetching function docs."""
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "500", request=MagicMock(), response=MagicMock(status_code=500)
-    )
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__.return_value = mock_client
-    mock_client.__aexit__.return_value = None
+    mock_client = page_client(500)
 
     async def mock_factory():
         return mock_client
@@ -324,6 +507,58 @@ async def test_fetch_function_http_error(provider):
     assert "500" in result["error"]
 
 
+def test_extract_markdown_small_page_converts_once(provider, monkeypatch):
+    """Test pages with only a title skip the per-element conversion."""
+    calls = []
+    original = logscale.html_to_markdown
+
+    def counting_html_to_markdown(html, base_url=""):
+        calls.append(html)
+        return original(html, base_url)
+
+    monkeypatch.setattr(logscale, "html_to_markdown", counting_html_to_markdown)
+    soup = BeautifulSoup(
+        "<main><h1>tail()</h1><div>Keep the last events.</div></main>", "html.parser"
+    )
+
+    markdown = provider._extract_markdown(soup, "https://example.com/")
+
+    assert len(calls) == 1
+    assert "tail()" in markdown
+    assert "Keep the last events." in markdown
+
+
+def test_extract_markdown_short_text_keeps_element_output(provider):
+    """Test pages with little text but long element markdown keep element-level output."""
+    links = "".join(
+        f'<a href="functions-{name}.html">{name}()</a> ' for name in ("head", "tail", "sort")
+    )
+    soup = BeautifulSoup(
+        f"<main><h1>tail()</h1><p>See also {links}</p>"
+        '<ul><li><a href="functions-head.html">head()</a></li>'
+        '<li><a href="functions-sort.html">sort()</a></li></ul></main>',
+        "html.parser",
+    )
+
+    markdown = provider._extract_markdown(soup, "https://library.humio.com/data-analysis/")
+
+    assert markdown.startswith("## tail()")
+    assert "See also" in markdown
+    assert "- [head()]" not in markdown
+
+
+@pytest.mark.parametrize("text", ["abcdef", "a\u00e9\u20ac\U0001f600"])
+def test_fit_content_truncates_on_character_boundary(provider, text, monkeypatch):
+    """Test content without sections is cut to max_bytes without splitting characters."""
+    monkeypatch.setattr(logscale, "extract_sections", lambda _: [])
+
+    result = provider._fit_content(text, max_bytes=5)
+
+    assert len(result.encode("utf-8")) <= 5
+    assert text.startswith(result)
+    assert provider._fit_content(text, max_bytes=100) == text
+
+
 def test_get_tools(provider):
     """Test get_tools returns expected tools."""
     tools = provider.get_tools()
@@ -341,14 +576,7 @@ def test_get_tools(provider):
 @pytest.mark.asyncio
 async def test_search_tool_returns_call_tool_result(provider, mock_functions_page):
     """Test that search tool returns proper CallToolResult."""
-    mock_response = MagicMock()
-    mock_response.text = mock_functions_page
-    mock_response.raise_for_status.return_value = None
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__.return_value = mock_client
-    mock_client.__aexit__.return_value = None
+    mock_client = page_client(mock_functions_page)
 
     async def mock_factory():
         return mock_client
@@ -370,6 +598,8 @@ def test_syntax_topics_mapping():
         assert "page" in info
         assert "description" in info
         assert info["page"].endswith(".html")
+        assert info["url"].endswith("/" + info["page"])
+        assert info["description_lower"] == info["description"].lower()
 
 
 def test_function_categories_mapping():
@@ -381,3 +611,5 @@ def test_function_categories_mapping():
         assert "description" in info
         assert info["page"].startswith("functions-")
         assert info["page"].endswith(".html")
+        assert info["url"].endswith("/" + info["page"])
+        assert info["description_lower"] == info["description"].lower()
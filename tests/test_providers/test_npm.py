@@ -1,11 +1,15 @@
 """Tests for NPM provider."""
 
+import asyncio
 import json
-from unittest.mock import AsyncMock, MagicMock
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 
+from src.RTFD import cache
+from src.RTFD.providers import npm
 from src.RTFD.providers.npm import NpmProvider
 from src.RTFD.utils import create_http_client
 
@@ -45,7 +49,7 @@ async def test_npm_search_success(provider, mock_npm_data):
     """Test successful search on NPM."""
     mock_response = MagicMock()
     mock_response.json.return_value = mock_npm_data
-    mock_response.text = json.dumps(mock_npm_data)
+    mock_response.content = json.dumps(mock_npm_data).encode()
     mock_response.raise_for_status.return_value = None
 
     mock_client = AsyncMock()
@@ -92,7 +96,7 @@ async def test_npm_metadata_tool(provider, mock_npm_data):
     """Test the npm_metadata tool."""
     mock_response = MagicMock()
     mock_response.json.return_value = mock_npm_data
-    mock_response.text = json.dumps(mock_npm_data)
+    mock_response.content = json.dumps(mock_npm_data).encode()
 
     mock_client = AsyncMock()
     mock_client.get.return_value = mock_response
@@ -116,7 +120,7 @@ async def test_fetch_npm_docs(provider, mock_npm_data):
     """Test fetching NPM docs (README)."""
     mock_response = MagicMock()
     mock_response.json.return_value = mock_npm_data
-    mock_response.text = json.dumps(mock_npm_data)
+    mock_response.content = json.dumps(mock_npm_data).encode()
     mock_response.raise_for_status.return_value = None
 
     mock_client = AsyncMock()
@@ -144,7 +148,7 @@ async def test_fetch_npm_docs_minimal(provider, mock_npm_data):
 
     mock_response = MagicMock()
     mock_response.json.return_value = mock_data
-    mock_response.text = json.dumps(mock_data)
+    mock_response.content = json.dumps(mock_data).encode()
 
     mock_client = AsyncMock()
     mock_client.get.return_value = mock_response
@@ -182,3 +186,192 @@ async def test_fetch_npm_docs_error(provider):
 
     assert "error" in result
     assert "returned 500" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_npm_reuses_http_client(mock_npm_data):
+    """Metadata and docs lookups share one pooled client that is closed once."""
+    mock_response = MagicMock()
+    mock_response.content = json.dumps(mock_npm_data).encode()
+    mock_response.raise_for_status.return_value = None
+
+    mock_client = AsyncMock()
+    mock_client.get.return_value = mock_response
+    factory = AsyncMock(return_value=mock_client)
+
+    provider = NpmProvider(factory)
+    await provider.search_library("example-pkg")
+    await provider._fetch_npm_docs("example-pkg")
+
+    factory.assert_awaited_once()
+    assert mock_client.get.await_count == 1  # docs reuse the cached metadata
+    mock_client.__aexit__.assert_not_called()
+
+    await provider.aclose()
+    mock_client.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_packages_metadata(mock_npm_data):
+    """Bulk lookups keep request order and report per-package errors in place."""
+
+    def respond(url, headers=None):
+        name = url.rsplit("/", 1)[-1]
+        response = MagicMock(status_code=404)
+        if name == "missing":
+            response.raise_for_status.side_effect = httpx.HTTPStatusError(
+                "404 Not Found", request=MagicMock(), response=response
+            )
+        else:
+            response.content = json.dumps({**mock_npm_data, "name": name}).encode()
+            response.raise_for_status.return_value = None
+        return response
+
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = respond
+
+    async def mock_factory():
+        return mock_client
+
+    provider = NpmProvider(mock_factory)
+
+    result = await provider._fetch_packages_metadata(["react", "missing", "vue"])
+
+    assert result["count"] == 3
+    assert [r.get("name") for r in result["packages"]] == ["react", None, "vue"]
+    assert result["packages"][1] == {"package": "missing", "error": "Package not found on npm"}
+    assert "npm_metadata_bulk" in provider.get_tools()
+    assert "npm_metadata_bulk" in provider.get_metadata().tool_names
+
+
+def registry_response(status_code=200, data=None, etag=None):
+    """Build a mock registry response with an optional ETag header."""
+    response = MagicMock(status_code=status_code)
+    response.headers = {"etag": etag} if etag else {}
+    response.content = json.dumps(data).encode() if data is not None else b""
+    response.raise_for_status.return_value = None
+    return response
+
+
+@pytest.mark.asyncio
+async def test_npm_metadata_is_cached(mock_npm_data):
+    """Repeat lookups within the TTL are served from memory."""
+    mock_client = AsyncMock()
+    mock_client.get.return_value = registry_response(data=mock_npm_data)
+    provider = NpmProvider(AsyncMock(return_value=mock_client))
+
+    first = await provider._fetch_metadata("example-pkg")
+    second = await provider._fetch_metadata("example-pkg")
+
+    assert first == second
+    assert mock_client.get.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_npm_metadata_revalidates_with_etag(mock_npm_data, monkeypatch):
+    """Expired entries are revalidated with If-None-Match; a 304 reuses the payload."""
+    monkeypatch.setenv("RTFD_NPM_CACHE_TTL", "60")
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = [
+        registry_response(data=mock_npm_data, etag='"v1"'),
+        registry_response(status_code=304),
+    ]
+    provider = NpmProvider(AsyncMock(return_value=mock_client))
+
+    first = await provider._fetch_metadata("example-pkg")
+    now = time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + 120)  # expire the entry
+    second = await provider._fetch_metadata("example-pkg")
+
+    assert second == first
+    assert mock_client.get.await_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+@pytest.mark.asyncio
+async def test_npm_metadata_cache_disabled(mock_npm_data, monkeypatch):
+    """RTFD_NPM_CACHE_TTL=0 fetches on every call."""
+    monkeypatch.setenv("RTFD_NPM_CACHE_TTL", "0")
+    mock_client = AsyncMock()
+    mock_client.get.return_value = registry_response(data=mock_npm_data, etag='"v1"')
+    provider = NpmProvider(AsyncMock(return_value=mock_client))
+
+    await provider._fetch_metadata("example-pkg")
+    await provider._fetch_metadata("example-pkg")
+
+    assert mock_client.get.await_count == 2
+    assert mock_client.get.await_args.kwargs["headers"] is None
+
+
+def test_parse_metadata_fields(mock_npm_data):
+    """Registry documents map onto the metadata dict, with defaults for missing keys."""
+    metadata = NpmProvider._parse_metadata(mock_npm_data)
+
+    assert metadata == {
+        "name": "example-pkg",
+        "version": "1.0.0",
+        "home_page": "https://example.com",
+        "docs_url": "https://example.com",
+        "license": "MIT",
+        "author": None,
+        "repository": "https://github.com/user/repo",
+        "summary": "An example package",
+        "keywords": [],
+        "maintainers": [{"name": "User", "email": "user@example.com"}],
+        "readme": mock_npm_data["readme"],
+    }
+    assert NpmProvider._parse_metadata({})["readme"] == ""
+
+
+def test_parse_metadata_tolerates_loose_shapes():
+    """String repositories are used as-is and non-dict maintainers are skipped."""
+    metadata = NpmProvider._parse_metadata(
+        {
+            "repository": "git+https://github.com/user/repo.git",
+            "maintainers": ["User <user@example.com>", {"name": "Other"}],
+        }
+    )
+
+    assert metadata["repository"] == "https://github.com/user/repo"
+    assert metadata["maintainers"] == [{"name": "Other", "email": None}]
+    assert NpmProvider._parse_metadata({"repository": ["not", "a", "url"]})["repository"] is None
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_load_registry_document(mock_npm_data, use_msgspec):
+    """Only the keys read by _parse_metadata are kept, with or without msgspec."""
+    if use_msgspec:
+        pytest.importorskip("msgspec")
+    document = {**mock_npm_data, "versions": {"1.0.0": {"name": "example-pkg"}}}
+    module = npm.msgspec if use_msgspec else None
+    with patch.object(npm, "msgspec", module):
+        loaded = npm._load_registry_document(json.dumps(document).encode())
+        lenient = npm._load_registry_document(b'{"name": "pkg", "readme": "a\tb"}')
+
+    if use_msgspec:
+        assert loaded == mock_npm_data
+    assert NpmProvider._parse_metadata(loaded) == NpmProvider._parse_metadata(document)
+    assert lenient["readme"] == "a\tb"
+
+
+@pytest.mark.asyncio
+async def test_fetch_packages_metadata_bounds_concurrency(mock_npm_data, monkeypatch):
+    """Bulk lookups keep at most RTFD_NPM_CONCURRENCY requests in flight."""
+    monkeypatch.setenv("RTFD_NPM_CONCURRENCY", "2")
+    in_flight = peak = 0
+
+    async def get(url, headers=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return registry_response(data=mock_npm_data)
+
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = get
+    provider = NpmProvider(AsyncMock(return_value=mock_client))
+
+    result = await provider._fetch_packages_metadata([f"pkg-{i}" for i in range(6)])
+
+    assert result["count"] == 6
+    assert peak == 2
@@ -1,6 +1,9 @@
 """Tests for MCP server and aggregator."""
 
+import sys
 import time
+import types
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -90,7 +93,7 @@ async def test_search_library_docs_returns_json_string():
     text_content = result.content[0].text
     assert isinstance(text_content, str)
     # Check for JSON format indicators
-    assert '{"library": "requests"' in text_content
+    assert '{"library":"requests"' in text_content
     assert '"pypi":' in text_content
 
 
@@ -196,5 +199,49 @@ async def test_get_cache_info(monkeypatch):
 
     assert result.content[0].type == "text"
     text_content = result.content[0].text
-    assert '"entry_count": 10' in text_content
-    assert '"db_path": "/tmp/test.db"' in text_content
+    assert '"entry_count":10' in text_content
+    assert '"db_path":"/tmp/test.db"' in text_content
+
+
+def test_run_uses_uvloop_when_installed():
+    """run() hands anyio uvloop's loop factory if available, and uses mcp.run() otherwise."""
+    from src.RTFD import server
+
+    fake_uvloop = types.ModuleType("uvloop")
+    fake_uvloop.new_event_loop = MagicMock(name="new_event_loop")
+
+    with (
+        patch.object(server.mcp, "run") as mcp_run,
+        patch.object(server.anyio, "run") as anyio_run,
+    ):
+        with patch.dict(sys.modules, {"uvloop": fake_uvloop}):
+            server.run()
+        anyio_run.assert_called_once_with(
+            server.mcp.run_stdio_async,
+            backend_options={"loop_factory": fake_uvloop.new_event_loop},
+        )
+        mcp_run.assert_not_called()
+
+        anyio_run.reset_mock()
+        with patch.dict(sys.modules, {"uvloop": None}):
+            server.run()
+        anyio_run.assert_not_called()
+        mcp_run.assert_called_once_with()
+
+
+def test_run_never_sets_event_loop_policy():
+    """The deprecated event loop policy API is not used, whatever the Python version."""
+    from src.RTFD import server
+
+    fake_uvloop = types.ModuleType("uvloop")
+    fake_uvloop.new_event_loop = MagicMock(name="new_event_loop")
+
+    with (
+        patch.object(server.anyio, "run") as anyio_run,
+        patch.object(server.asyncio, "set_event_loop_policy") as set_policy,
+        patch.object(server.sys, "version_info", (3, 10, 14)),
+        patch.dict(sys.modules, {"uvloop": fake_uvloop}),
+    ):
+        server.run()
+    set_policy.assert_not_called()
+    anyio_run.assert_called_once()
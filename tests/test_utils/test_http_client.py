@@ -0,0 +1,49 @@
+"""Tests for the shared HTTP client configuration."""
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.RTFD import utils
+from src.RTFD.utils import create_http_client
+
+
+@pytest.mark.asyncio
+async def test_create_http_client_configuration():
+    """Test the shared client follows redirects and requests compressed bodies."""
+    client = await create_http_client()
+    try:
+        assert client.follow_redirects is True
+        assert "gzip" in client.headers["Accept-Encoding"]
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not utils.HTTP2_AVAILABLE, reason="h2 is not installed")
+async def test_create_http_client_negotiates_http2():
+    """Test the client is built with HTTP/2, the shared pool limits and TLS context."""
+    with patch.object(utils.httpx, "AsyncClient", wraps=httpx.AsyncClient) as client_cls:
+        client = await create_http_client()
+    try:
+        kwargs = client_cls.call_args.kwargs
+        assert kwargs["http2"] is True
+        assert kwargs["limits"] is utils.DEFAULT_LIMITS
+        assert kwargs["verify"] is utils._ssl_context()
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_create_http_client_without_h2():
+    """Test the client falls back to HTTP/1.1 when h2 is not installed."""
+    with (
+        patch.object(utils, "HTTP2_AVAILABLE", False),
+        patch.object(utils.httpx, "AsyncClient", wraps=httpx.AsyncClient) as client_cls,
+    ):
+        client = await create_http_client()
+    try:
+        assert client_cls.call_args.kwargs["http2"] is False
+    finally:
+        await client.aclose()
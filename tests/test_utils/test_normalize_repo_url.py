@@ -0,0 +1,25 @@
+"""Tests for repository URL normalization in utils.py."""
+
+import pytest
+
+from src.RTFD.utils import normalize_repo_url
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("git+https://github.com/user/repo.git", "https://github.com/user/repo"),
+        ("https://github.com/user/repo", "https://github.com/user/repo"),
+        ("git://github.com/user/repo.git", "https://github.com/user/repo"),
+        ("git+ssh://git@github.com/user/repo.git", "https://github.com/user/repo"),
+        ("ssh://git@github.com:22/user/repo.git", "https://github.com/user/repo"),
+        ("ssh://git@host/org/@scope-pkg", "https://host/org/@scope-pkg"),
+        ("git@github.com:user/repo.git", "https://github.com/user/repo"),
+        ("github:user/repo", "github:user/repo"),
+        ("", ""),
+        (None, None),
+    ],
+)
+def test_normalize_repo_url(url, expected):
+    """Manifest repository URLs are rewritten to browsable https URLs."""
+    assert normalize_repo_url(url) == expected
@@ -0,0 +1,122 @@
+"""Tests for environment, JSON parsing and serialization helpers in utils.py."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.RTFD import utils
+from src.RTFD.utils import safe_json_loads
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_safe_json_loads_accepts_str_and_bytes(use_orjson):
+    """Both str and raw bytes bodies parse, with or without orjson."""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    module = utils.orjson if use_orjson else None
+    with patch.object(utils, "orjson", module):
+        assert safe_json_loads('{"name": "nginx"}') == {"name": "nginx"}
+        assert safe_json_loads(b'{"name": "nginx"}') == {"name": "nginx"}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_safe_json_loads_tolerates_control_characters(use_orjson):
+    """Unescaped control characters in strings fall back to lenient parsing."""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    module = utils.orjson if use_orjson else None
+    with patch.object(utils, "orjson", module):
+        assert safe_json_loads(b'{"readme": "line\tone\nline two"}') == {
+            "readme": "line\tone\nline two"
+        }
+
+
+def test_is_fetch_enabled_is_cached(monkeypatch):
+    """RTFD_FETCH is read once; cache_clear() picks up runtime changes."""
+    utils.is_fetch_enabled.cache_clear()
+    monkeypatch.setenv("RTFD_FETCH", "false")
+    try:
+        assert utils.is_fetch_enabled() is False
+
+        monkeypatch.setenv("RTFD_FETCH", "true")
+        assert utils.is_fetch_enabled() is False
+
+        utils.is_fetch_enabled.cache_clear()
+        assert utils.is_fetch_enabled() is True
+    finally:
+        utils.is_fetch_enabled.cache_clear()
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_serialize_response_round_trips(use_orjson):
+    """Responses encode to compact JSON that parses back to the payload."""
+    data = {"name": "café", "count": 3, "tags": ["a", None], 1: "numeric key"}
+    if use_orjson:
+        pytest.importorskip("orjson")
+    module = utils.orjson if use_orjson else None
+    with patch.object(utils, "orjson", module):
+        text = utils.serialize_response(data)
+    assert ", " not in text and '": ' not in text
+    assert json.loads(text) == {"name": "café", "count": 3, "tags": ["a", None], "1": "numeric key"}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_serialize_response_stringifies_unknown_types(use_orjson):
+    """Values the encoder cannot represent natively are stringified."""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    module = utils.orjson if use_orjson else None
+    with patch.object(utils, "orjson", module):
+        text = utils.serialize_response({"path": Path("/tmp/x"), "big": 2**70})
+    assert json.loads(text) == {"path": "/tmp/x", "big": 2**70}
+
+
+def test_serialize_response_with_meta_counts_bytes(monkeypatch):
+    """bytes_json reports the encoded size, not the character count."""
+    monkeypatch.setenv("RTFD_TRACK_TOKENS", "true")
+    utils.reload_env()
+    try:
+        result = utils.serialize_response_with_meta({"name": "café"})
+    finally:
+        monkeypatch.delenv("RTFD_TRACK_TOKENS")
+        utils.reload_env()
+    text = result.content[0].text
+    assert result.meta["token_stats"]["bytes_json"] == len(text.encode("utf-8"))
+
+
+def test_token_tracking_is_cached(monkeypatch):
+    """RTFD_TRACK_TOKENS is read once; reload_env() picks up runtime changes."""
+    monkeypatch.setenv("RTFD_TRACK_TOKENS", "false")
+    utils.reload_env()
+    try:
+        assert utils.serialize_response_with_meta({}).meta is None
+
+        monkeypatch.setenv("RTFD_TRACK_TOKENS", "true")
+        assert utils.serialize_response_with_meta({}).meta is None
+
+        utils.reload_env()
+        assert "token_stats" in utils.serialize_response_with_meta({}).meta
+    finally:
+        monkeypatch.delenv("RTFD_TRACK_TOKENS")
+        utils.reload_env()
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_serialize_response_bytes_matches_str_variant(use_orjson):
+    """The bytes variant is the UTF-8 encoding of serialize_response()."""
+    data = {"name": "café", "items": [1, 2]}
+    if use_orjson:
+        pytest.importorskip("orjson")
+    module = utils.orjson if use_orjson else None
+    with patch.object(utils, "orjson", module):
+        raw = utils.serialize_response_bytes(data)
+        assert isinstance(raw, bytes)
+        assert raw.decode("utf-8") == utils.serialize_response(data)
+
+
+def test_serialize_response_passes_text_through():
+    """Plain text is returned as-is; force_json=True still quotes it."""
+    assert utils.serialize_response('already "formatted"') == 'already "formatted"'
+    assert utils.serialize_response("text", force_json=True) == '"text"'